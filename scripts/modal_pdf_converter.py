@@ -1,101 +1,197 @@
 import modal
+import hashlib
 import os
+import shutil
+import uuid
+import warnings
+from io import BytesIO
 from pathlib import Path
+from tempfile import NamedTemporaryFile
 import fastapi
 import fastapi.staticfiles
+from fastapi.concurrency import run_in_threadpool
 
 app = modal.App("pdf-to-md-jobs")
 web_app = fastapi.FastAPI()
 
-model_volume = modal.Volume.from_name("models-volume", create_if_missing=True)
-VOLUME_PATH = "/root/.cache"
+# Requests from the Zotero client arrive one PDF at a time as the user reads, so
+# consecutive calls tend to land close together. Keeping the GPU container
+# around between them turns most calls into warm ones. A fixed idle window is
+# only an approximation when the gaps vary, so both knobs can be overridden at
+# deploy time. No container is kept warm by default, since that bills an L40S
+# around the clock; interactive deployments can opt in with
+# PDF_CONVERTER_KEEP_WARM=1.
+CONTAINER_IDLE_TIMEOUT = int(os.environ.get("PDF_CONVERTER_IDLE_TIMEOUT", "600"))
+KEEP_WARM = int(os.environ.get("PDF_CONVERTER_KEEP_WARM", "0"))
 
-inference_image = modal.Image.debian_slim(python_version="3.12").pip_install(
-    "marker-pdf>=1.5.5", 
-    "platformdirs",
-    "fastapi[standard]==0.115.11",
+# Precision for marker's layout/OCR/table models. The L40S has native bf16 tensor
+# cores; set MARKER_DTYPE=float32 at deploy time to fall back to full precision.
+MARKER_DTYPE = os.environ.get("MARKER_DTYPE", "bfloat16")
+
+# marker only accepts a file path, so PDFs are staged on tmpfs when available
+# to keep the round-trip in memory rather than on the worker's disk
+TMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Converted markdown is kept on a volume keyed by the whole PDF's SHA-256, so a
+# PDF that has been seen before is returned without splitting it or touching the
+# GPU. It is mounted outside /root/.cache so it doesn't hide the weights baked
+# into the image.
+results_volume = modal.Volume.from_name("marker-results", create_if_missing=True)
+RESULTS_PATH = "/results"
+
+def cache_file(pdf: bytes) -> Path:
+    return Path(RESULTS_PATH) / f"{hashlib.sha256(pdf).hexdigest()}.md"
+
+def cached_markdown(pdfs: list[bytes]) -> list[str | None]:
+    """Cached markdown for each PDF, or None where it hasn't been converted yet."""
+    # pick up entries committed by other containers since this one started
+    results_volume.reload()
+    return [f.read_text(encoding="utf-8") if f.exists() else None
+            for f in map(cache_file, pdfs)]
+
+def cache_markdown(results: dict[bytes, str]):
+    """Store newly converted markdown, with a single volume commit."""
+    if not results:
+        return
+    for pdf, markdown in results.items():
+        cache_file(pdf).write_text(markdown, encoding="utf-8")
+    results_volume.commit()
+
+# Uploaded PDFs are streamed onto this volume by the web app and read back by
+# convert_pdf, so the web worker never holds a whole PDF in memory.
+uploads_volume = modal.Volume.from_name("pdf-uploads", create_if_missing=True)
+UPLOADS_PATH = "/uploads"
+
+def download_models():
+    # runs once at image build time so the marker/surya weights are baked into
+    # an image layer instead of being fetched from HuggingFace on first request
+    from marker.models import create_model_dict
+
+    create_model_dict()
+
+inference_image = (
+    modal.Image.debian_slim(python_version="3.12")
+    .pip_install(
+        "marker-pdf>=1.5.5", 
+        "platformdirs",
+        "fastapi[standard]==0.115.11",
+    )
+    .run_function(download_models)
+    .env({"MARKER_DTYPE": MARKER_DTYPE})
 )
 
+# only imported inside containers running inference_image; elsewhere (the web
+# app, the local entrypoint) marker isn't installed and this block is skipped
+with inference_image.imports():
+    import torch
+    from marker.converters.pdf import PdfConverter
+    from marker.models import create_model_dict
+    from marker.output import text_from_rendered
+
 @app.cls(
     gpu="l40s",
-    volumes={VOLUME_PATH: model_volume},
     image=inference_image,
+    volumes={RESULTS_PATH: results_volume},
+    container_idle_timeout=CONTAINER_IDLE_TIMEOUT,
+    keep_warm=KEEP_WARM,
 )
 class Converter:
     @modal.enter()
     def setup(self):
-        import warnings
-        import os
-        from pathlib import Path
-        import shutil
-
-        from marker.converters.pdf import PdfConverter
-        from marker.models import create_model_dict
-        from platformdirs import user_cache_dir
-
+        # weights are already on local disk, so this only loads them onto the GPU
         with warnings.catch_warnings():  
             warnings.simplefilter("ignore")
             
+            self.models = create_model_dict(dtype=getattr(torch, MARKER_DTYPE))
+            # figures are skipped by default; the image-extracting converter is
+            # only built if a caller asks for it
             converter = PdfConverter(
-                artifact_dict=create_model_dict(),
+                artifact_dict=self.models,
+                config={"extract_images": False},
             )
-
-            model_volume.commit()
         self.converter = converter
+        self.image_converter = None
 
-    @modal.method()
-    def parse_pdf(self, pdf: bytes) -> str:
-        import os
-        from tempfile import NamedTemporaryFile
-        from marker.output import text_from_rendered
-        with NamedTemporaryFile(delete=False, mode="wb+") as temp_file:
+    @modal.exit()
+    def teardown(self):
+        # release the models' VRAM as soon as the container is scaled down
+        # rather than when the process is finally reaped
+        del self.converter, self.image_converter, self.models
+        torch.cuda.empty_cache()
+
+    def _get_image_converter(self):
+        if self.image_converter is None:
+            self.image_converter = PdfConverter(artifact_dict=self.models)
+        return self.image_converter
+
+    def _convert(self, pdf: bytes, include_images: bool = False) -> str | dict:
+        converter = self._get_image_converter() if include_images else self.converter
+        # the file is removed when the block exits; marker has finished reading it by then
+        with NamedTemporaryFile(mode="wb+", suffix=".pdf", dir=TMP_DIR) as temp_file:
             temp_file.write(pdf)
-            rendered = self.converter(str(temp_file.name))
-            text, _, images = text_from_rendered(rendered)
-
-        return text
-
-# def setup():
-#     import warnings
-#     import os
-#     from pathlib import Path
-#     import shutil
-# 
-#     from marker.converters.pdf import PdfConverter
-#     from marker.models import create_model_dict
-#     from platformdirs import user_cache_dir
-# 
-#     with warnings.catch_warnings():  
-#         warnings.simplefilter("ignore")
-#         
-#         converter = PdfConverter(
-#             artifact_dict=create_model_dict(),
-#         )
-# 
-#         model_volume.commit()
-# 
-#     return converter
-# 
-# @app.function(
-#     gpu="l40s",
-#     retries=3,
-#     volumes={VOLUME_PATH: model_volume},
-#     image=inference_image,
-# )
-# def parse_pdf(pdf: bytes) -> str:
-#     import os
-#     from tempfile import NamedTemporaryFile
-#     from marker.output import text_from_rendered
-#    
-#     converter = setup()
-# 
-#     with NamedTemporaryFile(delete=False, mode="wb+") as temp_file:
-#         temp_file.write(pdf)
-#         rendered = converter(str(temp_file.name))
-#         text, _, images = text_from_rendered(rendered)
-# 
-#     # print("Result: ", text)
-#     return text
+            temp_file.flush()
+            # ask the kernel to have the whole file in the page cache before
+            # marker's parser starts faulting it in; a no-op on tmpfs
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(temp_file.fileno(), 0, len(pdf), os.POSIX_FADV_WILLNEED)
+            rendered = converter(str(temp_file.name))
+
+        if not include_images:
+            return rendered.markdown
+
+        text, _, images = text_from_rendered(rendered)
+        encoded_images = {}
+        for name, image in images.items():
+            buffer = BytesIO()
+            image.save(buffer, format="PNG")
+            encoded_images[name] = buffer.getvalue()
+        return {"markdown": text, "images": encoded_images}
+
+    def _convert_cached(self, pdfs: list[bytes]) -> list[str]:
+        """Markdown for each PDF; only cache misses are converted."""
+        results = cached_markdown(pdfs)
+        converted = {}
+        for i, pdf in enumerate(pdfs):
+            if results[i] is None:
+                results[i] = converted[pdf] = self._convert(pdf)
+        cache_markdown(converted)
+        return results
+
+    @modal.method()
+    def parse_pdf(self, pdf: bytes, include_images: bool = False) -> str | dict:
+        """Convert a PDF to markdown.
+
+        With include_images=True, returns {"markdown": ..., "images": {name: png_bytes}}
+        instead of the bare markdown string.
+        """
+        if include_images:
+            return self._convert(pdf, include_images=True)
+        return self._convert_cached([pdf])[0]
+
+    @modal.method()
+    def parse_pdf_batch(self, pdfs: list[bytes]) -> list[str]:
+        # one container converts the whole batch, so the model setup is paid
+        # once instead of once per PDF
+        return self._convert_cached(pdfs)
+
+    @modal.method()
+    def parse_page(self, page: bytes) -> str:
+        # expects a single-page PDF produced by split_pages; pages aren't cached,
+        # the whole document is (see parse_document)
+        return self._convert(page)
+
+def split_pages(pdf: bytes) -> list[bytes]:
+    """Split a PDF into one single-page PDF per page, in order."""
+    from pypdf import PdfReader, PdfWriter
+
+    pages = []
+    for page in PdfReader(BytesIO(pdf)).pages:
+        writer = PdfWriter()
+        writer.add_page(page)
+        buffer = BytesIO()
+        writer.write(buffer)
+        pages.append(buffer.getvalue())
+    return pages
 
 @app.local_entrypoint()
 def main(local_filename: str = None):
@@ -103,35 +199,41 @@ def main(local_filename: str = None):
 
     local_filename = Path(local_filename)
 
-    if local_filename.exists():
+    if local_filename.is_dir():
+        pdf_paths = sorted(local_filename.glob("*.pdf"))
+        print(f"Parsing {len(pdf_paths)} PDFs in {local_filename}...")
+        converter = Converter()
+        results = converter.parse_pdf_batch.remote([p.read_bytes() for p in pdf_paths])
+        for pdf_path, data in zip(pdf_paths, results):
+            print(f"# {pdf_path.name}")
+            print(data)
+
+    elif local_filename.exists():
         pdf_file = local_filename.read_bytes()
         print(f"Parsing {local_filename}...")
-        # print(parse_pdf.remote(pdf_file))
-        converter = Converter()
-        data = converter.parse_pdf.remote(pdf_file)
-        print(data)
+        print(parse_document.remote(pdf_file))
 
     else:
         print(f"Error: File '{local_filename}' does not exist")
 
-converter = Converter()
 @web_app.post("/parse")
 async def parse(request: fastapi.Request):
 
-    # parse_pdf = modal.Function.from_name(
-    #     "pdf-to-md-jobs", "parse_pdf"
-    # )
-    # call = converter.parse_pdf(paper)
-
     form = await request.form()
-    paper = await form["paper"].read()  # type: ignore
+    upload_name = await run_in_threadpool(save_upload, form["paper"])  # type: ignore
+
+    # the conversion runs in the background; clients poll /result/{call_id}
+    call = convert_pdf.spawn(upload_name)
+    return {"call_id": call.object_id}
+
+@web_app.post("/parse_batch")
+async def parse_batch(request: fastapi.Request):
 
-    # sync:
-    return converter.parse_pdf.remote(paper)
+    form = await request.form()
+    papers = [await paper.read() for paper in form.getlist("papers")]  # type: ignore
 
-    # async:
-    # call = parse_pdf.spawn(paper)
-    # return {"call_id": call.object_id}
+    call = Converter().parse_pdf_batch.spawn(papers)
+    return {"call_id": call.object_id}
 
 @web_app.get("/result/{call_id}")
 async def poll_results(call_id: str):
@@ -145,10 +247,44 @@ async def poll_results(call_id: str):
 
 fastapi_image = modal.Image.debian_slim(python_version="3.12").pip_install(
     "fastapi[standard]==0.115.11",
-    "pydantic>=2.0.0"
+    "pydantic>=2.0.0",
+    "pypdf>=3.0.0",
 )
 
-@app.function(image=fastapi_image)
+def save_upload(upload) -> str:
+    """Copy an uploaded file onto the uploads volume in chunks, returning its name there."""
+    upload_name = f"{uuid.uuid4().hex}.pdf"
+    with open(Path(UPLOADS_PATH) / upload_name, "wb") as f:
+        shutil.copyfileobj(upload.file, f, 1024 * 1024)
+    uploads_volume.commit()
+    return upload_name
+
+def _parse_document(pdf: bytes) -> str:
+    # a PDF seen before is answered from the cache, before it is split
+    [markdown] = cached_markdown([pdf])
+    if markdown is None:
+        # pages are converted in parallel and stitched back together in order
+        markdown = "\n\n".join(Converter().parse_page.map(split_pages(pdf)))
+        cache_markdown({pdf: markdown})
+    return markdown
+
+@app.function(image=fastapi_image, volumes={RESULTS_PATH: results_volume})
+def parse_document(pdf: bytes) -> str:
+    """Convert a PDF page-parallel, splitting it on a CPU container."""
+    return _parse_document(pdf)
+
+@app.function(image=fastapi_image, volumes={UPLOADS_PATH: uploads_volume, RESULTS_PATH: results_volume})
+def convert_pdf(upload_name: str) -> str:
+    # splits on a CPU container and fans the pages out to the GPU converters,
+    # so /parse can hand back a call id without waiting on the whole document
+    uploads_volume.reload()
+    upload = Path(UPLOADS_PATH) / upload_name
+    pdf = upload.read_bytes()
+    upload.unlink()
+    uploads_volume.commit()
+    return _parse_document(pdf)
+
+@app.function(image=fastapi_image, volumes={UPLOADS_PATH: uploads_volume})
 @modal.asgi_app()
 def fastapi_app():
     return web_app
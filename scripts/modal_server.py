@@ -1,25 +1,40 @@
+import shutil
+import uuid
 from pathlib import Path
 
 import fastapi
 import fastapi.staticfiles
+from fastapi.concurrency import run_in_threadpool
 import modal
 
 app = modal.App("pdf-to-md-server")
 
+# shared with the pdf-to-md-jobs app, whose convert_pdf reads uploads from here
+uploads_volume = modal.Volume.from_name("pdf-uploads", create_if_missing=True)
+UPLOADS_PATH = "/uploads"
+
 web_app = fastapi.FastAPI()
 
 @web_app.post("/parse")
 async def parse(request: fastapi.Request):
-    parse_pdf = modal.Function.from_name(
-        "pdf-to-md-jobs", "parse_pdf"
+    convert_pdf = modal.Function.from_name(
+        "pdf-to-md-jobs", "convert_pdf"
     )
 
     form = await request.form()
-    paper = await form["paper"].read()  # type: ignore
-    call = parse_pdf.spawn(paper)
+    upload_name = await run_in_threadpool(save_upload, form["paper"])  # type: ignore
+    call = convert_pdf.spawn(upload_name)
 
     return {"call_id": call.object_id}
 
+def save_upload(upload) -> str:
+    # stream the upload onto the volume in chunks instead of reading it into memory
+    upload_name = f"{uuid.uuid4().hex}.pdf"
+    with open(Path(UPLOADS_PATH) / upload_name, "wb") as f:
+        shutil.copyfileobj(upload.file, f, 1024 * 1024)
+    uploads_volume.commit()
+    return upload_name
+
 @web_app.get("/result/{call_id}")
 async def poll_results(call_id: str):
     function_call = modal.functions.FunctionCall.from_id(call_id)
@@ -34,7 +49,7 @@ image = modal.Image.debian_slim(python_version="3.12").pip_install(
     "fastapi[standard]==0.115.4"
 )
 
-@app.function(image=image)
+@app.function(image=image, volumes={UPLOADS_PATH: uploads_volume})
 @modal.asgi_app()
 def fastapi_app():
     return web_app
@@ -1,4 +1,7 @@
 import argparse
+import glob
+import hashlib
+import os
 import sys
 import time
 from pathlib import Path
@@ -6,54 +9,129 @@ from marker.converters.pdf import PdfConverter
 from marker.models import create_model_dict
 from marker.output import text_from_rendered
 
+# markdown for PDFs converted without images is cached here by content hash
+CACHE_DIR = Path(os.environ.get('ZOTERO_MCP_CACHE_DIR', Path.home() / '.cache' / 'zotero-mcp')) / 'marker'
+
+def load_converter(save_images: bool) -> PdfConverter:
+    # MARKER_DTYPE (e.g. float16, bfloat16) is opt-in here since this script
+    # also runs on CPU-only machines
+    dtype = os.environ.get("MARKER_DTYPE")
+    if dtype:
+        import torch
+        dtype = getattr(torch, dtype)
+
+    # image extraction is only worth paying for when the images are saved
+    return PdfConverter(
+        artifact_dict=create_model_dict(dtype=dtype),
+        config={"extract_images": save_images},
+    )
+
+def convert(converter: PdfConverter, pdf_path: Path, save_images: bool) -> tuple:
+    """Convert one PDF. Returns (text, images, convert_time, extract_time)."""
+    convert_start = time.time()
+    rendered = converter(str(pdf_path))
+    convert_time = time.time() - convert_start
+
+    extract_start = time.time()
+    if save_images:
+        text, _, images = text_from_rendered(rendered)
+    else:
+        text, images = rendered.markdown, {}
+    extract_time = time.time() - extract_start
+
+    return text, images, convert_time, extract_time
+
+def write_images(images: dict, image_dir: Path):
+    image_dir.mkdir(parents=True, exist_ok=True)
+    for idx, img in enumerate(images.values()):
+        img_path = image_dir / f"image_{idx}.png"
+        img.save(img_path)
+        print(f"Saved image to {img_path}", file=sys.stderr)
+
+def collect_pdfs(pattern: str) -> list:
+    """Expand a directory or glob pattern into a sorted list of PDF paths."""
+    path = Path(pattern)
+    if path.is_dir():
+        return sorted(path.glob("*.pdf"))
+    return sorted(Path(p) for p in glob.glob(pattern))
+
 def main():
     start_time = time.time()
-    
+
     parser = argparse.ArgumentParser(description='Convert PDF files to text using marker')
-    parser.add_argument('pdf_path', type=str, help='Path to the PDF file')
-    parser.add_argument('--output', '-o', type=str, help='Output file path (optional, defaults to stdout)')
+    parser.add_argument('pdf_path', type=str, help='Path to the PDF file (or a directory / glob with --batch)')
+    parser.add_argument('--output', '-o', type=str, help='Output file path (optional, defaults to stdout); output directory with --batch')
+    parser.add_argument('--batch', '-b', action='store_true', help='Convert every PDF matched by pdf_path, loading the models once')
     parser.add_argument('--save-images', '-i', action='store_true', help='Save extracted images')
     parser.add_argument('--image-dir', type=str, default='images', help='Directory to save images (default: images/)')
+    parser.add_argument('--no-cache', action='store_true', help='Always run marker, ignoring and not updating the markdown cache')
     parser.add_argument('--quiet', '-q', action='store_true', help='Suppress timing information')
 
     args = parser.parse_args()
 
-    pdf_path = Path(args.pdf_path)
-    if not pdf_path.exists():
-        print(f"Error: PDF file '{pdf_path}' does not exist", file=sys.stderr)
-        sys.exit(1)
+    if args.batch:
+        pdf_paths = collect_pdfs(args.pdf_path)
+        if not pdf_paths:
+            print(f"Error: no PDF files match '{args.pdf_path}'", file=sys.stderr)
+            sys.exit(1)
+    else:
+        pdf_path = Path(args.pdf_path)
+        if not pdf_path.exists():
+            print(f"Error: PDF file '{pdf_path}' does not exist", file=sys.stderr)
+            sys.exit(1)
+        pdf_paths = [pdf_path]
 
-    converter = PdfConverter(
-        artifact_dict=create_model_dict(),
-    )
+    # models are only loaded once a PDF misses the cache
+    converter = None
+    load_time = convert_time = extract_time = 0.0
+    for pdf_path in pdf_paths:
+        cache_file = None
+        if not args.save_images and not args.no_cache:
+            cache_file = CACHE_DIR / f"{hashlib.sha256(pdf_path.read_bytes()).hexdigest()}.md"
 
-    convert_start = time.time()
-    rendered = converter(str(pdf_path))
-    convert_time = time.time() - convert_start
+        if cache_file is not None and cache_file.exists():
+            text, images = cache_file.read_text(encoding='utf-8'), {}
+            file_convert_time = file_extract_time = 0.0
+        else:
+            if converter is None:
+                load_start = time.time()
+                converter = load_converter(args.save_images)
+                load_time = time.time() - load_start
+            text, images, file_convert_time, file_extract_time = convert(converter, pdf_path, args.save_images)
+            if cache_file is not None:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                cache_file.write_text(text, encoding='utf-8')
 
-    extract_start = time.time()
-    text, _, images = text_from_rendered(rendered)
-    extract_time = time.time() - extract_start
+        convert_time += file_convert_time
+        extract_time += file_extract_time
 
-    if args.output:
-        with open(args.output, 'w', encoding='utf-8') as f:
-            f.write(text)
-    else:
-        print(text)
+        if args.batch:
+            if args.output:
+                output_dir = Path(args.output)
+                output_dir.mkdir(parents=True, exist_ok=True)
+                with open(output_dir / f"{pdf_path.stem}.md", 'w', encoding='utf-8') as f:
+                    f.write(text)
+            else:
+                print(f"# {pdf_path.name}")
+                print(text)
+            if not args.quiet:
+                print(f"{pdf_path.name}: {file_convert_time:.2f}s", file=sys.stderr)
+        elif args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text)
+        else:
+            print(text)
 
-    # save images if requested
-    if args.save_images and images:
-        image_dir = Path(args.image_dir)
-        image_dir.mkdir(exist_ok=True)
-        for idx, img in enumerate(images):
-            img_path = image_dir / f"image_{idx}.png"
-            img.save(img_path)
-            print(f"Saved image to {img_path}", file=sys.stderr)
+        # save images if requested
+        if args.save_images and images:
+            image_dir = Path(args.image_dir)
+            write_images(images, image_dir / pdf_path.stem if args.batch else image_dir)
 
     total_time = time.time() - start_time
-    
+
     if not args.quiet:
         print("\nTiming Information:", file=sys.stderr)
+        print(f"Model Loading: {load_time:.2f}s", file=sys.stderr)
         print(f"PDF Conversion: {convert_time:.2f}s", file=sys.stderr)
         print(f"Text Extraction: {extract_time:.2f}s", file=sys.stderr)
         print(f"Total Time: {total_time:.2f}s", file=sys.stderr)
@@ -1,45 +1,144 @@
 #!/usr/bin/env python3
 """
 Simple script to query Zotero API directly.
-Run with: python zotero_query.py "your search query"
+Run with: python zotero_query.py "your search query" [--full]
+      or: python zotero_query.py --repl   (one query per line on stdin)
 """
 
+import argparse
+import functools
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from pathlib import Path
 from dotenv import load_dotenv
 from pyzotero import zotero
 from pypdf import PdfReader
 
-def get_pdf_content(zot, item_key: str) -> tuple:
-    """Get the PDF content for a given item.
-    Returns (success, content, attachment_key)
+# full-text extractions are cached here, one file per attachment key
+CACHE_DIR = Path(os.environ.get('ZOTERO_MCP_CACHE_DIR', Path.home() / '.cache' / 'zotero-mcp'))
+PAGE_SEPARATOR = "\f"
+
+# results are requested from the API this many at a time
+PAGE_SIZE = 25
+
+# child lists kept per query; cleared between --repl queries so attachments
+# added in Zotero meanwhile are found
+CHILDREN_CACHE_SIZE = 1024
+
+@functools.lru_cache(maxsize=CHILDREN_CACHE_SIZE)
+def get_children(item_key: str) -> list:
+    """Child items (attachments, notes) of an item, fetched once per key."""
+    return thread_client().children(item_key)
+
+def find_pdf_attachment(item: dict) -> str | None:
+    """Key of the item's PDF attachment, or None if it has none."""
+    # Look for PDF attachment in the links
+    links = item.get('links', {})
+    if 'attachment' in links and links['attachment']['attachmentType'] == 'application/pdf':
+        return links['attachment']['href'].split('/')[-1]
+    
+    # If not found in links, check children
+    for child in get_children(item['key']):
+        if child['data'].get('itemType') == 'attachment' and child['data'].get('contentType') == 'application/pdf':
+            return child['key']
+    
+    return None
+
+def extract_pages(pdf_content: bytes, full: bool = False) -> list:
+    """Extract page text with MuPDF when installed, falling back to pypdf.
+
+    Only the first page is extracted unless full is set.
     """
     try:
-        # First get the item to find its attachments
-        item = zot.item(item_key)
-        
-        # Look for PDF attachment in the links
-        if 'attachment' in item['links'] and item['links']['attachment']['attachmentType'] == 'application/pdf':
-            attachment_key = item['links']['attachment']['href'].split('/')[-1]
-            # Get the PDF content
+        import pymupdf
+        with pymupdf.open(stream=pdf_content, filetype="pdf") as doc:
+            pages = doc if full else doc.pages(0, min(1, doc.page_count))
+            return [page.get_text() for page in pages]
+    except Exception:
+        # pymupdf missing or unable to open the file
+        reader = PdfReader(BytesIO(pdf_content))
+        pages = reader.pages if full else reader.pages[:1]
+        return [page.extract_text() for page in pages]
+
+def read_cached_pages(attachment_key: str) -> list | None:
+    cache_file = CACHE_DIR / f"{attachment_key}.txt"
+    if not cache_file.exists():
+        return None
+    return cache_file.read_text(encoding='utf-8').split(PAGE_SEPARATOR)
+
+def write_cached_pages(attachment_key: str, pages: list):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    (CACHE_DIR / f"{attachment_key}.txt").write_text(PAGE_SEPARATOR.join(pages), encoding='utf-8')
+
+def connect() -> zotero.Zotero:
+    """Create a client for the local Zotero API using the credentials in the environment."""
+    return zotero.Zotero(
+        os.environ['ZOTERO_USER_ID'],
+        "user",
+        os.environ['ZOTERO_API_KEY'],
+        local=True
+    )
+
+_thread_state = threading.local()
+
+def thread_client() -> zotero.Zotero:
+    """Per-thread Zotero client.
+
+    pyzotero keeps per-request state on the Zotero object, so worker threads
+    can't share one; each keeps its own, along with its pooled keep-alive
+    connections, for every item it handles.
+    """
+    if not hasattr(_thread_state, 'zot'):
+        _thread_state.zot = connect()
+    return _thread_state.zot
+
+def process_item(item: dict, full: bool = False) -> str:
+    """Fetch and extract one item's PDF, returning the text to print for it."""
+    lines = []
+    data = item['data']
+    title = data.get('title', 'No title')
+    key = data.get('key')
+    
+    # Check for PDF
+    zot = thread_client()
+    pdf_content = None
+    try:
+        attachment_key = find_pdf_attachment(item)
+        pages = read_cached_pages(attachment_key) if attachment_key else None
+        if attachment_key and pages is None:
             pdf_content = zot.file(attachment_key)
-            return True, pdf_content, attachment_key
-        
-        # If not found in links, check children
-        children = zot.children(item_key)
-        for child in children:
-            if child['data'].get('itemType') == 'attachment' and child['data'].get('contentType') == 'application/pdf':
-                pdf_content = zot.file(child['key'])
-                return True, pdf_content, child['key']
-        
-        return False, None, None
-        
     except Exception as e:
-        print(f"Error getting PDF content: {e}")
-        return False, None, None
+        lines.append(f"Error getting PDF content: {e}")
+        attachment_key = None
+    pdf_status = f"[PDF: {attachment_key}]" if attachment_key else "[No PDF]"
+    if attachment_key:
+        try:
+            if pages is None:
+                pages = extract_pages(pdf_content, full=full)
+                if full:
+                    write_cached_pages(attachment_key, pages)
+            # preview: only the first page is shown
+            lines.extend(pages if full else pages[:1])
+        except Exception as e:
+            # If decoding fails, show hex representation
+            lines.append(f"Error decoding PDF content: {e}")
+            lines.append("\nPDF Content (hex, first 100 bytes):")
+            lines.append(pdf_content[:100].hex())
+    
+    lines.append(f"\n{pdf_status} {title}")
+    lines.append(f"Key: {key}")
+    if data.get('abstractNote'):
+        lines.append(f"Abstract: {data['abstractNote'][:200]}...")
+        lines.append(str(data))
+    lines.append("-" * 80)
+    return "\n".join(lines)
 
-def main():
+@functools.lru_cache(maxsize=1)
+def init_zotero() -> zotero.Zotero:
+    """Load .env, check credentials and connect; done once per process."""
     load_dotenv()
     
     if not os.environ.get("ZOTERO_API_KEY") or not os.environ.get("ZOTERO_USER_ID"):
@@ -47,12 +146,7 @@ def main():
         sys.exit(1)
     
     try:
-        zot = zotero.Zotero(
-            os.environ['ZOTERO_USER_ID'],
-            "user",
-            os.environ['ZOTERO_API_KEY'],
-            local=True
-        )
+        zot = connect()
         # Test the connection
         zot.items(limit=1)
     except Exception as e:
@@ -62,41 +156,59 @@ def main():
         else:
             print(f"Error connecting to Zotero: {e}")
             sys.exit(1)
+    return zot
+
+def iter_pages(zot, query: str, page_size: int = PAGE_SIZE):
+    """Yield search results a page at a time by following the API's 'next' links."""
+    # same as zot.makeiter(zot.items(...)) minus its repeated first request
+    page = zot.items(q=query, limit=page_size)
+    while page:
+        yield page
+        if not zot.links.get('next'):
+            return
+        page = zot.follow()
+
+def run_query(zot, pool: ThreadPoolExecutor, query: str, full: bool = False):
+    print(f"\nResults for query '{query}':")
+    # each page is handed to the pool as soon as it arrives, and the next page
+    # is fetched while the previous one is still being processed; map() keeps
+    # the output in result order
+    total = 0
+    pending = None
+    for page in iter_pages(zot, query):
+        results = pool.map(functools.partial(process_item, full=full), page)
+        if pending is not None:
+            for output in pending:
+                print(output)
+        pending = results
+        total += len(page)
+    if pending is not None:
+        for output in pending:
+            print(output)
+    print(f"\nFound {total} items matching query '{query}'")
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the local Zotero API')
+    parser.add_argument('query', nargs='?', default='machine learning', help='Search query (default: "machine learning")')
+    parser.add_argument('--full', action='store_true', help='Print the text of every PDF page instead of a first-page preview')
+    parser.add_argument('--workers', type=int, default=8, help='Number of items fetched and extracted concurrently (default: 8)')
+    parser.add_argument('--repl', action='store_true', help='Read queries from stdin, one per line, reusing the same connection')
+    args = parser.parse_args()
+
+    zot = init_zotero()
     
-    query = sys.argv[1] if len(sys.argv) > 1 else "machine learning"
-    
-    items = zot.items(q=query)
-    
-    print(f"\nFound {len(items)} items matching query '{query}':")
-    for item in items:
-        data = item['data']
-        title = data.get('title', 'No title')
-        key = data.get('key')
-        
-        # Check for PDF
-        has_pdf, _, attachment_key = get_pdf_content(zot, key)
-        pdf_status = f"[PDF: {attachment_key}]" if has_pdf else "[No PDF]"
-        if has_pdf:
-            pdf_content = zot.file(attachment_key)
-            try:
-                # Try to decode as UTF-8 text first
-                reader = PdfReader(BytesIO(pdf_content))
-                # print(reader.pages[0].extract_text()[:1000])
-                print(reader.pages[0].extract_text())
-                for page in reader.pages:
-                    print(page.extract_text())
-            except Exception as e:
-                # If decoding fails, show hex representation
-                print(f"Error decoding PDF content: {e}")
-                print("\nPDF Content (hex, first 100 bytes):")
-                print(pdf_content[:100].hex())
-        
-        print(f"\n{pdf_status} {title}")
-        print(f"Key: {key}")
-        if data.get('abstractNote'):
-            print(f"Abstract: {data['abstractNote'][:200]}...")
-            print(data)
-        print("-" * 80)
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        if not args.repl:
+            run_query(zot, pool, args.query, full=args.full)
+            return
+
+        if sys.stdin.isatty():
+            print("Enter a query per line (Ctrl-D to quit).")
+        for line in sys.stdin:
+            query = line.strip()
+            if query:
+                get_children.cache_clear()
+                run_query(zot, pool, query, full=args.full)
         
 
 if __name__ == "__main__":
@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 """SQLite-based MCP server implementation for Zotero integration."""
 
+import asyncio
+import hashlib
 import json
 import logging
+import multiprocessing
 import os
+import re
+import secrets
 import sqlite3
-import random
-import string
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from typing import Any, Dict, List, Optional
 from pathlib import Path
 from datetime import datetime
@@ -18,6 +27,8 @@ from fastmcp import FastMCP, Context
 from pypdf import PdfReader
 from io import BytesIO
 
+from zotero_mcp.pdf_worker import extract_pages
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -27,205 +38,431 @@ mcp = FastMCP(
     capabilities={"tools": True}
 )
 
+# stay below SQLITE_MAX_VARIABLE_NUMBER (999 on builds before 3.32)
+MAX_QUERY_PARAMS = 900
+
+# WAL lets reads proceed while add_note writes, but it persistently changes the
+# journal mode of the Zotero database, so it's opt-in
+USE_WAL = os.environ.get('ZOTERO_DB_WAL', '0') == '1'
+
+# Extra indexes are written into the Zotero database itself (SQLite can't keep
+# them in a separate file), so creating them is opt-in as well
+CREATE_INDEXES = os.environ.get('ZOTERO_DB_CREATE_INDEXES', '0') == '1'
+
+# Full-text index over titles and abstracts, kept in a sidecar database so the
+# Zotero database itself isn't modified
+CACHE_DIR = Path(os.environ.get('ZOTERO_MCP_CACHE_DIR', Path.home() / '.cache' / 'zotero-mcp'))
+
+# Search results are memoized per library state; the state is re-read at most
+# this often, so edits made in Zotero show up after a few seconds
+SEARCH_CACHE_SIZE = 128
+LIBRARY_STATE_TTL = 5.0
+
+# PDFs with at least this many pages have their text extracted in a process
+# pool; below it, starting the workers costs more than it saves
+PARALLEL_PDF_MIN_PAGES = 8
+
+# characters Zotero itself uses for object keys (no 0, 1 or O)
+_KEY_ALPHABET = '23456789ABCDEFGHIJKLMNPQRSTUVWXYZ'
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+def _extract_pages_parallel(pdf_bytes: bytes, page_count: int) -> List[str]:
+    """Extract the text of every page, spreading contiguous page ranges over worker processes."""
+    global _pdf_pool
+    workers = os.cpu_count() or 1
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # spawn rather than fork: this process already runs an event loop
+            # and worker threads, which a forked child would inherit half-way
+            _pdf_pool = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context('spawn'))
+    
+    # one range per worker, so each process parses the document only once
+    step = -(-page_count // workers)
+    futures = [_pdf_pool.submit(extract_pages, pdf_bytes, start, min(start + step, page_count))
+               for start in range(0, page_count, step)]
+    return [text for future in futures for text in future.result()]
+
 class ZoteroDatabase:
     """Direct SQLite database interface for Zotero."""
     
     def __init__(self, db_path: str):
         self.db_path = Path(db_path).expanduser()
         self.storage_path = self.db_path.parent / "storage"
+        # one long-lived connection per thread, reused across queries
+        self._local = threading.local()
+        
+        # memoized lookups, keyed on the library state so they go stale with it
+        self._search_cached = lru_cache(maxsize=SEARCH_CACHE_SIZE)(self._search_uncached)
+        self._item_cached = lru_cache(maxsize=SEARCH_CACHE_SIZE)(self._item_uncached)
+        self._state = None
+        self._state_checked = 0.0
+        # attachment key -> PDF file in the storage directory
+        self._pdf_path_cache: Dict[str, Path] = {}
         
         if not self.db_path.exists():
             raise FileNotFoundError(f"Zotero database not found: {self.db_path}")
         
+        db_hash = hashlib.sha1(str(self.db_path.resolve()).encode()).hexdigest()[:12]
+        self.fts_path = CACHE_DIR / f"fts-{db_hash}.sqlite"
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Full-text search disabled, cannot create {CACHE_DIR}: {e}")
+            self.fts_path = None
+        
         # Test connection
         self._test_connection()
+        
+        # schema lookup tables are fixed for a given Zotero version, so resolve
+        # names to IDs once instead of joining itemTypes/fields on every query
+        conn = self._connection()
+        self.item_type_ids = dict(conn.execute("SELECT typeName, itemTypeID FROM itemTypes").fetchall())
+        self.field_ids = dict(conn.execute("SELECT fieldName, fieldID FROM fields").fetchall())
+        
+        if CREATE_INDEXES:
+            self._create_indexes()
+        
+        self.fts_enabled = self.fts_path is not None and self._sync_fts()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None: reads run in autocommit mode, writes open
+            # their own transaction in _execute_write
+            conn = sqlite3.connect(str(self.db_path), timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._configure(conn)
+            if self.fts_path is not None:
+                conn.execute("ATTACH DATABASE ? AS fts", (str(self.fts_path),))
+            self._local.conn = conn
+        return conn
+    
+    def _configure(self, conn: sqlite3.Connection):
+        """Per-connection tuning, applied once when a connection is opened."""
+        conn.execute("PRAGMA busy_timeout = 30000")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA mmap_size = 268435456")  # 256 MiB
+        conn.execute("PRAGMA cache_size = -65536")  # 64 MiB
+        # journal_mode is stored in the database file itself, so switching
+        # Zotero's own database to WAL is left to the user
+        if USE_WAL:
+            conn.execute("PRAGMA journal_mode = WAL")
+            # only safe with WAL; in rollback-journal mode NORMAL can corrupt
+            # the database on power loss, so the default FULL is kept there
+            conn.execute("PRAGMA synchronous = NORMAL")
     
     def _test_connection(self):
         """Test database connection and basic schema."""
         try:
-            with sqlite3.connect(str(self.db_path), timeout=5.0) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM items")
-                count = cursor.fetchone()[0]
-                logger.info(f"Connected to Zotero database with {count} items")
+            cursor = self._connection().cursor()
+            cursor.execute("SELECT COUNT(*) FROM items")
+            count = cursor.fetchone()[0]
+            logger.info(f"Connected to Zotero database with {count} items")
         except sqlite3.Error as e:
             raise ConnectionError(f"Failed to connect to database: {e}")
     
-    def _execute_read(self, query: str, params: tuple = ()) -> List[Dict]:
-        """Execute a read query and return results as list of dicts."""
+    def _create_indexes(self):
+        """Add indexes for the lookups this server does that Zotero's schema doesn't cover."""
+        indexes = [
+            "CREATE INDEX IF NOT EXISTS idx_mcp_items_key ON items(key)",
+            "CREATE INDEX IF NOT EXISTS idx_mcp_itemtags_item ON itemTags(itemID, tagID)",
+            "CREATE INDEX IF NOT EXISTS idx_mcp_itemdata_item_field ON itemData(itemID, fieldID, valueID)",
+            "CREATE INDEX IF NOT EXISTS idx_mcp_attachments_parent_type ON itemAttachments(parentItemID, contentType)",
+        ]
+        try:
+            conn = self._connection()
+            for statement in indexes:
+                conn.execute(statement)
+            logger.info("Ensured lookup indexes on the Zotero database")
+        except sqlite3.Error as e:
+            # e.g. the database is locked by a running Zotero; the server still works without them
+            logger.warning(f"Could not create indexes: {e}")
+    
+    def _sync_fts(self) -> bool:
+        """(Re)build the full-text index if the library changed since it was last built.
+        
+        Zotero keeps the database locked while it runs, so the library can only
+        change between server runs; notes added by this server aren't indexed.
+        Returns False if FTS5 is unavailable, in which case searches fall back to LIKE.
+        """
+        conn = self._connection()
+        try:
+            state = self._read_library_state()
+            conn.execute("CREATE TABLE IF NOT EXISTS fts.sync_state (item_count INTEGER, last_modified TEXT)")
+            indexed = conn.execute("SELECT 1 FROM fts.sqlite_master WHERE name = 'zotero_fts'").fetchone()
+            synced = conn.execute("SELECT item_count, last_modified FROM fts.sync_state").fetchone()
+            if indexed and synced and tuple(synced) == state:
+                return True
+            
+            conn.execute("BEGIN")
+            conn.execute("DROP TABLE IF EXISTS fts.zotero_fts")
+            # contentless: the rowid is the itemID, the text stays in Zotero's tables
+            conn.execute("CREATE VIRTUAL TABLE fts.zotero_fts USING fts5(title, abstract, content='')")
+            title_id, abstract_id = self._field_id('title'), self._field_id('abstractNote')
+            conn.execute("""
+                INSERT INTO fts.zotero_fts (rowid, title, abstract)
+                SELECT id.itemID,
+                       MAX(CASE WHEN id.fieldID = ? THEN idv.value END),
+                       MAX(CASE WHEN id.fieldID = ? THEN idv.value END)
+                FROM itemData id
+                JOIN itemDataValues idv ON id.valueID = idv.valueID
+                WHERE id.fieldID IN (?, ?)
+                GROUP BY id.itemID
+            """, (title_id, abstract_id, title_id, abstract_id))
+            conn.execute("DELETE FROM fts.sync_state")
+            conn.execute("INSERT INTO fts.sync_state VALUES (?, ?)", state)
+            conn.commit()
+            logger.info(f"Built full-text index for {state[0]} items")
+            return True
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.warning(f"Full-text search unavailable, falling back to LIKE: {e}")
+            return False
+    
+    def _read_library_state(self) -> tuple:
+        """(item count, last modification time): changes whenever items are added, edited or removed."""
+        return tuple(self._connection().execute("SELECT COUNT(*), MAX(dateModified) FROM items").fetchone())
+    
+    def _library_state(self) -> tuple:
+        """The library state, re-read from the database at most every LIBRARY_STATE_TTL seconds."""
+        now = time.monotonic()
+        if self._state is None or now - self._state_checked > LIBRARY_STATE_TTL:
+            self._state = self._read_library_state()
+            self._state_checked = now
+        return self._state
+    
+    def clear_caches(self):
+        """Drop memoized results, e.g. after this server wrote to the library."""
+        self._search_cached.cache_clear()
+        self._item_cached.cache_clear()
+        self._state = None
+    
+    def _execute_read(self, query: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """Execute a read query and return the rows.
+        
+        Rows support ``row['column']`` access; callers that add keys convert
+        them with ``dict(row)`` themselves.
+        """
         try:
-            with sqlite3.connect(str(self.db_path), timeout=10.0) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                return [dict(row) for row in cursor.fetchall()]
+            cursor = self._connection().cursor()
+            cursor.execute(query, params)
+            return cursor.fetchall()
         except sqlite3.Error as e:
             logger.error(f"Database read error: {e}")
             raise
     
     def _execute_write(self, operations: List[tuple]) -> Dict[str, Any]:
-        """Execute write operations in a transaction."""
+        """Execute write operations in a transaction.
+        
+        Each operation is ``(query, params)``, or ``(query, params_list, True)``
+        to run the statement once per parameter tuple via executemany.
+        """
+        conn = self._connection()
         try:
-            with sqlite3.connect(str(self.db_path), timeout=10.0) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                # Begin transaction
-                cursor.execute("BEGIN IMMEDIATE")
-                
-                results = []
-                for query, params in operations:
+            cursor = conn.cursor()
+            
+            # Begin transaction
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            results = []
+            for query, params, *many in operations:
+                if many and many[0]:
+                    cursor.executemany(query, params)
+                else:
                     cursor.execute(query, params)
-                    results.append(cursor.lastrowid)
-                
-                conn.commit()
-                return {"status": "success", "results": results}
+                results.append(cursor.lastrowid)
+            
+            conn.commit()
+            return {"status": "success", "results": results}
                 
         except sqlite3.Error as e:
             logger.error(f"Database write error: {e}")
             return {"status": "error", "message": str(e)}
+        finally:
+            # the connection outlives this call, so never leave a failed
+            # transaction open on it
+            if conn.in_transaction:
+                conn.rollback()
+    
+    def _read_grouped(self, query: str, item_ids: List[int]) -> Dict[int, List[sqlite3.Row]]:
+        """Run a per-item query for many items at once and bucket the rows by itemID.
+        
+        The query selects an itemID column and has an ``IN ({placeholders})``
+        clause; ids are sent in batches to stay under SQLite's bound-parameter limit.
+        """
+        grouped = defaultdict(list)
+        for start in range(0, len(item_ids), MAX_QUERY_PARAMS):
+            batch = item_ids[start:start + MAX_QUERY_PARAMS]
+            placeholders = ','.join('?' * len(batch))
+            for row in self._execute_read(query.format(placeholders=placeholders), tuple(batch)):
+                grouped[row['itemID']].append(row)
+        return grouped
+    
+    def _field_id(self, name: str) -> int:
+        """ID of a field by name; -1 (matching nothing) if this schema lacks it."""
+        return self.field_ids.get(name, -1)
     
     def _generate_key(self) -> str:
         """Generate a new 8-character Zotero-style key."""
-        return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+        return ''.join(secrets.choice(_KEY_ALPHABET) for _ in range(8))
     
-    def search_items(self, query: str = None, tags: List[str] = None) -> List[Dict]:
-        """Search for items using direct SQL."""
+    def search_items(self, query: str = None, tags: List[str] = None) -> tuple:
+        """Search for items using direct SQL.
         
-        base_query = """
-        SELECT 
-            i.itemID,
-            i.key,
-            i.dateAdded,
-            i.dateModified,
-            it.typeName as itemType,
-            -- Get title
-            (SELECT idv.value 
-             FROM itemData id 
-             JOIN itemDataValues idv ON id.valueID = idv.valueID
-             JOIN fields f ON id.fieldID = f.fieldID  
-             WHERE id.itemID = i.itemID AND f.fieldName = 'title') as title,
-            -- Get abstract
-            (SELECT idv.value 
-             FROM itemData id 
-             JOIN itemDataValues idv ON id.valueID = idv.valueID
-             JOIN fields f ON id.fieldID = f.fieldID  
-             WHERE id.itemID = i.itemID AND f.fieldName = 'abstractNote') as abstract,
-            -- Get URL
-            (SELECT idv.value 
-             FROM itemData id 
-             JOIN itemDataValues idv ON id.valueID = idv.valueID
-             JOIN fields f ON id.fieldID = f.fieldID  
-             WHERE id.itemID = i.itemID AND f.fieldName = 'url') as url,
-            -- Get date
-            (SELECT idv.value 
-             FROM itemData id 
-             JOIN itemDataValues idv ON id.valueID = idv.valueID
-             JOIN fields f ON id.fieldID = f.fieldID  
-             WHERE id.itemID = i.itemID AND f.fieldName = 'date') as date
-        FROM items i
-        JOIN itemTypes it ON i.itemTypeID = it.itemTypeID
-        WHERE it.typeName NOT IN ('attachment', 'note')
+        Results are memoized and shared between calls, so treat them as read-only.
         """
-        
+        return self._search_cached(query, tuple(tags) if tags else (), self._library_state())
+    
+    def _search_uncached(self, query: Optional[str], tags: tuple, state: tuple) -> tuple:
         params = []
         conditions = []
         
-        if query:
+        # every word of the query, as a prefix, in the title or abstract
+        fts_query = ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query or ''))
+        
+        if query and self.fts_enabled and fts_query:
+            conditions.append("""
+                i.itemID IN (SELECT rowid FROM fts.zotero_fts WHERE zotero_fts MATCH ?)
+            """)
+            params.append(fts_query)
+        elif query:
             conditions.append("""
                 (EXISTS (SELECT 1 FROM itemData id 
                         JOIN itemDataValues idv ON id.valueID = idv.valueID
-                        JOIN fields f ON id.fieldID = f.fieldID  
                         WHERE id.itemID = i.itemID 
-                        AND f.fieldName = 'title' 
+                        AND id.fieldID = ? 
                         AND idv.value LIKE ?))
             """)
-            params.append(f"%{query}%")
+            params.extend([self._field_id('title'), f"%{query}%"])
         
         if tags:
-            for tag in tags:
-                conditions.append("""
-                    EXISTS (SELECT 1 FROM itemTags itn 
-                           JOIN tags t ON itn.tagID = t.tagID 
-                           WHERE itn.itemID = i.itemID AND t.name = ?)
-                """)
-                params.append(tag)
+            # one uncorrelated pass over the tag index: items carrying every tag
+            unique_tags = list(dict.fromkeys(tags))
+            placeholders = ','.join('?' * len(unique_tags))
+            conditions.append(f"""
+                i.itemID IN (SELECT itn.itemID FROM itemTags itn 
+                            JOIN tags t ON itn.tagID = t.tagID 
+                            WHERE t.name IN ({placeholders})
+                            GROUP BY itn.itemID
+                            HAVING COUNT(DISTINCT t.tagID) = ?)
+            """)
+            params.extend(unique_tags)
+            params.append(len(unique_tags))
+        
+        return tuple(self._search_items(conditions, params))
+    
+    def _search_items(self, conditions: List[str], params: List[Any]) -> List[Dict]:
+        """Fetch regular items (not attachments or notes) matching all SQL conditions,
+        with their creators and tags."""
+        
+        # One pass over the four wanted fields per item: each (item, field) pair is
+        # a primary-key probe into itemData, folded back into columns by GROUP BY.
+        base_query = """
+        SELECT 
+            i.itemID,
+            i.key,
+            i.dateAdded,
+            i.dateModified,
+            it.typeName as itemType,
+            MAX(CASE WHEN id.fieldID = ? THEN idv.value END) as title,
+            MAX(CASE WHEN id.fieldID = ? THEN idv.value END) as abstract,
+            MAX(CASE WHEN id.fieldID = ? THEN idv.value END) as url,
+            MAX(CASE WHEN id.fieldID = ? THEN idv.value END) as date
+        FROM items i
+        JOIN itemTypes it ON i.itemTypeID = it.itemTypeID
+        LEFT JOIN itemData id ON id.itemID = i.itemID AND id.fieldID IN (?, ?, ?, ?)
+        LEFT JOIN itemDataValues idv ON id.valueID = idv.valueID
+        WHERE i.itemTypeID NOT IN (?, ?)
+        """
+        field_ids = [self._field_id(name) for name in ('title', 'abstractNote', 'url', 'date')]
+        excluded_types = [self.item_type_ids.get(name, -1) for name in ('attachment', 'note')]
+        params = field_ids + field_ids + excluded_types + list(params)
         
         if conditions:
             base_query += " AND " + " AND ".join(conditions)
         
-        base_query += " ORDER BY i.dateModified DESC"
+        base_query += " GROUP BY i.itemID ORDER BY i.dateModified DESC"
+        
+        # items get creators and tags attached below, so these rows become dicts
+        results = [dict(row) for row in self._execute_read(base_query, tuple(params))]
         
-        results = self._execute_read(base_query, tuple(params))
+        # Enhance results with creators and tags, fetched for all items at once
+        item_ids = [item['itemID'] for item in results]
+        
+        creators_query = """
+            SELECT ic.itemID, c.firstName, c.lastName, ct.creatorType
+            FROM itemCreators ic
+            JOIN creators c ON ic.creatorID = c.creatorID
+            JOIN creatorTypes ct ON ic.creatorTypeID = ct.creatorTypeID
+            WHERE ic.itemID IN ({placeholders})
+            ORDER BY ic.itemID, ic.orderIndex
+        """
+        creators_by_item = self._read_grouped(creators_query, item_ids)
+        
+        tags_query = """
+            SELECT itn.itemID, t.name
+            FROM itemTags itn
+            JOIN tags t ON itn.tagID = t.tagID
+            WHERE itn.itemID IN ({placeholders})
+            ORDER BY t.name
+        """
+        tags_by_item = self._read_grouped(tags_query, item_ids)
         
-        # Enhance results with creators and tags
         for item in results:
             item_id = item['itemID']
-            
-            # Get creators
-            creators_query = """
-                SELECT c.firstName, c.lastName, ct.creatorType
-                FROM itemCreators ic
-                JOIN creators c ON ic.creatorID = c.creatorID
-                JOIN creatorTypes ct ON ic.creatorTypeID = ct.creatorTypeID
-                WHERE ic.itemID = ?
-                ORDER BY ic.orderIndex
-            """
-            item['creators'] = self._execute_read(creators_query, (item_id,))
-            
-            # Get tags
-            tags_query = """
-                SELECT t.name
-                FROM itemTags itn
-                JOIN tags t ON itn.tagID = t.tagID
-                WHERE itn.itemID = ?
-            """
-            item['tags'] = [row['name'] for row in self._execute_read(tags_query, (item_id,))]
+            item['creators'] = creators_by_item.get(item_id, [])
+            item['tags'] = [row['name'] for row in tags_by_item.get(item_id, [])]
         
         return results
     
     def get_item_by_key(self, key: str) -> Optional[Dict]:
-        """Get a single item by its key."""
-        results = self._execute_read("SELECT itemID FROM items WHERE key = ?", (key,))
-        if not results:
-            return None
-        
-        items = self.search_items()
-        for item in items:
-            if item['key'] == key:
-                return item
-        return None
+        """Get a single item by its key (memoized like search_items)."""
+        return self._item_cached(key, self._library_state())
+    
+    def _item_uncached(self, key: str, state: tuple) -> Optional[Dict]:
+        items = self._search_items(["i.key = ?"], [key])
+        return items[0] if items else None
+    
+    def get_item_title(self, key: str) -> Optional[str]:
+        """Get just the title of an item, without the full item lookup."""
+        rows = self._execute_read("""
+            SELECT idv.value FROM items i
+            JOIN itemData id ON id.itemID = i.itemID AND id.fieldID = ?
+            JOIN itemDataValues idv ON id.valueID = idv.valueID
+            WHERE i.key = ?
+            LIMIT 1
+        """, (self._field_id('title'), key))
+        return rows[0]['value'] if rows else None
     
     def get_item_notes(self, item_key: str) -> List[Dict]:
         """Get all notes for an item."""
-        # First get the parent item ID
-        parent_result = self._execute_read("SELECT itemID FROM items WHERE key = ?", (item_key,))
-        if not parent_result:
-            return []
-        
-        parent_id = parent_result[0]['itemID']
-        
-        # Get notes
+        # Notes, found through the parent's key in the same query
         notes_query = """
             SELECT i.itemID, i.key, inotes.note, inotes.title
-            FROM items i
-            JOIN itemNotes inotes ON i.itemID = inotes.itemID
-            WHERE inotes.parentItemID = ?
+            FROM items parent
+            JOIN itemNotes inotes ON inotes.parentItemID = parent.itemID
+            JOIN items i ON i.itemID = inotes.itemID
+            WHERE parent.key = ?
             ORDER BY i.dateAdded
         """
-        notes = self._execute_read(notes_query, (parent_id,))
-        
-        # Get tags for each note
+        notes = [dict(row) for row in self._execute_read(notes_query, (item_key,))]
+        
+        # Tags for all notes at once
+        tags_query = """
+            SELECT itn.itemID, t.name
+            FROM itemTags itn
+            JOIN tags t ON itn.tagID = t.tagID
+            WHERE itn.itemID IN ({placeholders})
+            ORDER BY t.name
+        """
+        tags_by_note = self._read_grouped(tags_query, [note['itemID'] for note in notes])
         for note in notes:
-            note_id = note['itemID']
-            tags_query = """
-                SELECT t.name
-                FROM itemTags itn
-                JOIN tags t ON itn.tagID = t.tagID
-                WHERE itn.itemID = ?
-            """
-            note['tags'] = [row['name'] for row in self._execute_read(tags_query, (note_id,))]
+            note['tags'] = [row['name'] for row in tags_by_note.get(note['itemID'], [])]
         
         return notes
     
@@ -239,63 +476,71 @@ class ZoteroDatabase:
         parent_id = parent_result[0]['itemID']
         library_id = parent_result[0]['libraryID']
         
-        # Get next item ID
-        max_id_result = self._execute_read("SELECT MAX(itemID) as max_id FROM items")
-        new_item_id = (max_id_result[0]['max_id'] or 0) + 1
-        
-        # Get note type ID
-        note_type_result = self._execute_read("SELECT itemTypeID FROM itemTypes WHERE typeName = 'note'")
-        if not note_type_result:
+        note_type_id = self.item_type_ids.get('note')
+        if note_type_id is None:
             return {"status": "error", "message": "Note item type not found"}
-        note_type_id = note_type_result[0]['itemTypeID']
         
         # Generate new key and timestamp
         new_key = self._generate_key()
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
+        # SQLite assigns the new itemID inside the write transaction; later
+        # statements find it again through the (libraryID, key) unique index
+        new_item_id = "(SELECT itemID FROM items WHERE libraryID = ? AND key = ?)"
+        
         # Prepare operations
         operations = [
             # Create item record
-            ("INSERT INTO items (itemID, itemTypeID, dateAdded, dateModified, key, libraryID) VALUES (?, ?, ?, ?, ?, ?)",
-             (new_item_id, note_type_id, current_time, current_time, new_key, library_id)),
+            ("INSERT INTO items (itemTypeID, dateAdded, dateModified, key, libraryID) VALUES (?, ?, ?, ?, ?)",
+             (note_type_id, current_time, current_time, new_key, library_id)),
             
             # Add note content
-            ("INSERT INTO itemNotes (itemID, parentItemID, note) VALUES (?, ?, ?)",
-             (new_item_id, parent_id, note_text))
+            (f"INSERT INTO itemNotes (itemID, parentItemID, note) VALUES ({new_item_id}, ?, ?)",
+             (library_id, new_key, parent_id, note_text))
         ]
         
         # Handle tags if provided
         if tags:
-            # Get next tag ID
-            max_tag_result = self._execute_read("SELECT MAX(tagID) as max_id FROM tags")
-            next_tag_id = (max_tag_result[0]['max_id'] or 0) + 1
-            
-            for tag in tags:
-                # Create tag if it doesn't exist
-                operations.append(
-                    ("INSERT OR IGNORE INTO tags (tagID, name) VALUES (?, ?)",
-                     (next_tag_id, tag))
-                )
+            unique_tags = list(dict.fromkeys(tags))
+            operations += [
+                # Create tags that don't exist yet; SQLite assigns their tagID
+                ("INSERT OR IGNORE INTO tags (name) VALUES (?)",
+                 [(tag,) for tag in unique_tags], True),
                 
-                # Link tag to note
-                operations.append(
-                    ("INSERT INTO itemTags (itemID, tagID, type) VALUES (?, (SELECT tagID FROM tags WHERE name = ?), ?)",
-                     (new_item_id, tag, 0))
-                )
-                next_tag_id += 1
+                # Link tags to note
+                (f"INSERT INTO itemTags (itemID, tagID, type) SELECT {new_item_id}, tagID, 0 FROM tags WHERE name = ?",
+                 [(library_id, new_key, tag) for tag in unique_tags], True),
+            ]
         
         # Execute operations
         result = self._execute_write(operations)
         
         if result["status"] == "success":
+            self.clear_caches()
             return {
                 "status": "success",
                 "note_key": new_key,
-                "note_id": new_item_id
+                "note_id": result["results"][0]
             }
         else:
             return result
     
+    def _find_pdf_file(self, pdf_path: Path, stored_path: Optional[str]) -> Optional[Path]:
+        """Locate the PDF in an attachment directory.
+        
+        Stored attachments record their file as ``storage:<filename>``, which
+        avoids listing the directory; otherwise take the first PDF in it.
+        """
+        if stored_path and stored_path.startswith('storage:'):
+            candidate = pdf_path / stored_path.split(':', 1)[1]
+            if candidate.is_file():
+                return candidate
+        with os.scandir(pdf_path) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith('.pdf') and entry.is_file():
+                    return Path(entry.path)
+        return None
+    
     def get_pdf_content(self, item_key: str) -> Dict[str, Any]:
         """Get PDF content for an item."""
         # Get item ID
@@ -321,31 +566,32 @@ class ZoteroDatabase:
         
         attachment_key = attachments[0]['key']
         
-        # Try to read PDF file
-        pdf_path = self.storage_path / attachment_key
-        
-        # Look for PDF files in the attachment directory
-        if pdf_path.is_dir():
-            pdf_files = list(pdf_path.glob("*.pdf"))
-            if not pdf_files:
+        pdf_file = self._pdf_path_cache.get(attachment_key)
+        if pdf_file is None or not pdf_file.is_file():
+            pdf_path = self.storage_path / attachment_key
+            if not pdf_path.is_dir():
+                return {"success": False, "error": "Attachment directory not found"}
+            pdf_file = self._find_pdf_file(pdf_path, attachments[0]['path'])
+            if pdf_file is None:
                 return {"success": False, "error": "PDF file not found in storage"}
-            pdf_file = pdf_files[0]
-        else:
-            return {"success": False, "error": "Attachment directory not found"}
+            self._pdf_path_cache[attachment_key] = pdf_file
         
         # Extract text from PDF
         try:
-            with open(pdf_file, 'rb') as f:
-                pdf_reader = PdfReader(f)
-                text_content = ""
-                for page in pdf_reader.pages:
-                    text_content += page.extract_text() + "\n"
+            pdf_bytes = pdf_file.read_bytes()
+            pdf_reader = PdfReader(BytesIO(pdf_bytes))
+            page_count = len(pdf_reader.pages)
+            if page_count >= PARALLEL_PDF_MIN_PAGES:
+                page_texts = _extract_pages_parallel(pdf_bytes, page_count)
+            else:
+                page_texts = (page.extract_text() for page in pdf_reader.pages)
+            text_content = "".join(text + "\n" for text in page_texts)
             
             return {
                 "success": True,
                 "text_content": text_content,
                 "attachment_key": attachment_key,
-                "page_count": len(pdf_reader.pages)
+                "page_count": page_count
             }
         except Exception as e:
             logger.error(f"Error extracting PDF text: {e}")
@@ -354,40 +600,51 @@ class ZoteroDatabase:
                 "error": f"Failed to extract text from PDF: {str(e)}"
             }
 
-# Initialize database
-try:
-    db_path = os.environ.get('ZOTERO_DB_PATH', '~/Zotero/zotero.sqlite')
-    db = ZoteroDatabase(db_path)
-except Exception as e:
-    logger.error(f"Failed to initialize database: {e}")
-    exit(1)
+# Initialize database. When this module is run as the main module, PDF pool
+# workers re-import it as __mp_main__; they must not open (and re-index) it again.
+if __name__ != '__mp_main__':
+    try:
+        db_path = os.environ.get('ZOTERO_DB_PATH', '~/Zotero/zotero.sqlite')
+        db = ZoteroDatabase(db_path)
+    except Exception as e:
+        logger.error(f"Failed to initialize database: {e}")
+        exit(1)
+
+_item_fields = itemgetter('key', 'title', 'date', 'tags', 'abstract', 'url', 'itemType')
+_author_fields = itemgetter('firstName', 'lastName', 'creatorType')
+
+def _format_item(item: Dict) -> Dict[str, Any]:
+    """Shape a database item like the Zotero API results the tools return."""
+    key, title, date, tags, abstract, url, item_type = _item_fields(item)
+    return {
+        'key': key,
+        'title': title or 'Unknown Title',
+        'authors': [{'firstName': first, 'lastName': last, 'creatorType': creator_type}
+                    for first, last, creator_type in map(_author_fields, item['creators'])],
+        'year': date.split('-')[0] if date else None,
+        'tags': tags,
+        'abstract': abstract,
+        'url': url,
+        'item_type': item_type
+    }
+
+# Tools run the blocking database calls in worker threads (each thread keeps
+# its own connection), so a slow query or PDF extraction doesn't stall the
+# event loop and concurrent tool calls can overlap
 
 @mcp.tool()
-def search_papers(tags: List[str] = None, query: str = None) -> dict:
+async def search_papers(tags: List[str] = None, query: str = None) -> dict:
     """Search through Zotero papers based on tags and/or text.
     
     Args:
         tags: List of tags to filter by
-        query: Search query to filter by title and other fields
+        query: Words to look for (as prefixes) in titles and abstracts
     """
     try:
-        results = db.search_items(query=query, tags=tags)
+        results = await asyncio.to_thread(db.search_items, query=query, tags=tags)
         
         # Process results to match API format
-        processed_items = []
-        for item in results:
-            processed_item = {
-                'key': item['key'],
-                'title': item['title'] or 'Unknown Title',
-                'authors': [{'firstName': c['firstName'], 'lastName': c['lastName'], 'creatorType': c['creatorType']} 
-                           for c in item['creators']],
-                'year': item['date'].split('-')[0] if item['date'] else None,
-                'tags': item['tags'],
-                'abstract': item['abstract'],
-                'url': item['url'],
-                'item_type': item['itemType']
-            }
-            processed_items.append(processed_item)
+        processed_items = [_format_item(item) for item in results]
         
         return {
             "status": "success",
@@ -399,10 +656,10 @@ def search_papers(tags: List[str] = None, query: str = None) -> dict:
         return {"status": "error", "message": str(e)}
 
 @mcp.tool()
-def get_paper_notes(item_key: str) -> Dict[str, Any]:
+async def get_paper_notes(item_key: str) -> Dict[str, Any]:
     """Get all notes attached to a specific paper."""
     try:
-        notes = db.get_item_notes(item_key)
+        notes = await asyncio.to_thread(db.get_item_notes, item_key)
         return {
             "notes": [{
                 "key": note["key"],
@@ -416,39 +673,27 @@ def get_paper_notes(item_key: str) -> Dict[str, Any]:
         return {"status": "error", "message": str(e)}
 
 @mcp.tool()
-def get_paper(item_key: str) -> Dict[str, Any]:
+async def get_paper(item_key: str) -> Dict[str, Any]:
     """Get details for a specific paper."""
     try:
-        item = db.get_item_by_key(item_key)
+        item = await asyncio.to_thread(db.get_item_by_key, item_key)
         if not item:
             return {"status": "error", "message": "Paper not found"}
         
-        processed_item = {
-            'key': item['key'],
-            'title': item['title'] or 'Unknown Title',
-            'authors': [{'firstName': c['firstName'], 'lastName': c['lastName'], 'creatorType': c['creatorType']} 
-                       for c in item['creators']],
-            'year': item['date'].split('-')[0] if item['date'] else None,
-            'tags': item['tags'],
-            'abstract': item['abstract'],
-            'url': item['url'],
-            'item_type': item['itemType']
-        }
-        return {"status": "success", "item": processed_item}
+        return {"status": "success", "item": _format_item(item)}
     except Exception as e:
         logger.error(f"Error getting paper: {str(e)}")
         return {"status": "error", "message": str(e)}
 
 @mcp.tool()
-def add_note(item_key: str, note_text: str, tags: List[str] = None) -> dict:
+async def add_note(item_key: str, note_text: str, tags: List[str] = None) -> dict:
     """Add a note to a specific paper."""
     try:
-        result = db.add_note(item_key, note_text, tags)
+        result = await asyncio.to_thread(db.add_note, item_key, note_text, tags)
         
         if result["status"] == "success":
             # Get paper title for response
-            paper = db.get_item_by_key(item_key)
-            paper_title = paper['title'] if paper else "Unknown Paper"
+            paper_title = await asyncio.to_thread(db.get_item_title, item_key) or "Unknown Paper"
             
             return {
                 "status": "success",
@@ -463,14 +708,14 @@ def add_note(item_key: str, note_text: str, tags: List[str] = None) -> dict:
         return {"status": "error", "message": str(e)}
 
 @mcp.tool()
-def get_pdf_content(item_key: str) -> dict:
+async def get_pdf_content(item_key: str) -> dict:
     """Get the PDF content for a given item.
     
     Args:
         item_key: The Zotero item key
     """
     try:
-        return db.get_pdf_content(item_key)
+        return await asyncio.to_thread(db.get_pdf_content, item_key)
     except Exception as e:
         logger.error(f"Error getting PDF content: {e}")
         return {
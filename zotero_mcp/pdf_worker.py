@@ -0,0 +1,15 @@
+"""PDF page extraction run in db_server's process pool.
+
+Kept out of db_server so that pool workers, which import the function by
+module, don't open the Zotero database on startup.
+"""
+
+from io import BytesIO
+from typing import List
+
+from pypdf import PdfReader
+
+def extract_pages(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) of a PDF."""
+    reader = PdfReader(BytesIO(pdf_bytes))
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
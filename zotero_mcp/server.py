@@ -1,21 +1,28 @@
 #!/usr/bin/env python3
 """MCP server implementation for Zotero integration."""
 
-import json
+import asyncio
+import functools
+import inspect
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional
 from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 from dotenv import load_dotenv
 load_dotenv()
 
+import httpx
+import httpx2
+import msgspec
+import orjson
 from fastmcp import FastMCP, Context
 from pyzotero import zotero
-from anthropic import Anthropic
-from pypdf import PdfReader
 from io import BytesIO
-import tempfile
-import zipfile
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,32 +32,160 @@ SUMMARIZED_TAG_NAME = "summarized"
 ERROR_TAG_NAME = "error"
 DENY_TAG_NAME = "deny"
 
+# Reads go to the local API of the running Zotero desktop app by default; set
+# ZOTERO_LOCAL=0 to read from the web API instead. Writes always use the web API.
+USE_LOCAL_API = os.environ.get('ZOTERO_LOCAL', '1') == '1'
+
+# Item lookups hit the local Zotero HTTP API; agents often ask for the same
+# key several times in a row, so responses are reused for a short while
+ITEM_CACHE_SIZE = 512
+ITEM_CACHE_TTL = 60  # seconds
+# processed search_papers responses, keyed on (sorted tags, query)
+SEARCH_CACHE_SIZE = 128
+SEARCH_CACHE_TTL = 30  # seconds
+# item key -> key of its PDF attachment; a stale entry is caught when its
+# download fails, so these can live longer
+PDF_ATTACHMENT_CACHE_SIZE = 512
+PDF_ATTACHMENT_CACHE_TTL = 3600  # seconds
+
+# the Zotero API returns at most this many items per request
+API_PAGE_SIZE = 100
+
+# async tools talk to the read API directly, this many requests at a time
+BATCH_CONCURRENCY = 10
+
+# keep-alive pool and connection retries for pyzotero's HTTP client
+HTTP_POOL_SIZE = 20
+HTTP_RETRIES = 2
+HTTP_TIMEOUT = 30.0  # seconds
+
+class _TTLCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds."""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key) -> Any:
+        """Return the cached value, or None if it's missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._data.pop(key, None)
+            self.misses += 1
+            return None
+    
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+# shared stand-in for a missing item 'data' dict, so lookups don't allocate
+# a fresh {} per item; never mutated
+_EMPTY: Dict[str, Any] = {}
+
+# Marks a tool result that clients shouldn't keep in their prompt cache
+# (errors and one-off confirmations); merged into the result dict
+_NO_CACHE = {"_meta": {"cache_hint": "no-cache"}}
+
+_ITEM_CACHE = _TTLCache(ITEM_CACHE_SIZE, ITEM_CACHE_TTL)
+_SEARCH_CACHE = _TTLCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+# item key -> key of its PDF attachment, so repeat PDF fetches skip the lookup
+_PDF_ATTACHMENT_CACHE = _TTLCache(PDF_ATTACHMENT_CACHE_SIZE, PDF_ATTACHMENT_CACHE_TTL)
+
 mcp = FastMCP(
     "zotero-mcp-server",
     version="0.1.0",
     capabilities={"tools": True}
 )
 
-# Initialize both local and remote Zotero connections
-try:
-    # Local API for fast reads
-    zot_local = zotero.Zotero(
+# pyzotero decodes every API response with response.json(); these make that
+# a single msgspec pass over the raw bytes instead of the stdlib json module.
+# They're built on httpx2, the HTTP library pyzotero itself uses, so its error
+# handling, rate-limit backoff and file:// fallback keep working.
+_JSON_DECODER = msgspec.json.Decoder()
+
+class _MsgspecResponse(httpx2.Response):
+    def json(self, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().json(**kwargs)
+        return _JSON_DECODER.decode(self.content)
+
+class _MsgspecTransport(httpx2.HTTPTransport):
+    """HTTP transport whose responses decode JSON with msgspec."""
+    
+    def handle_request(self, request: httpx2.Request) -> httpx2.Response:
+        response = super().handle_request(request)
+        return _MsgspecResponse(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=response.stream,
+            extensions=response.extensions
+        )
+
+def _http_client(local: bool) -> httpx2.Client:
+    """HTTP client for pyzotero with a larger keep-alive pool, retries and msgspec
+    JSON decoding; otherwise configured like pyzotero's default client."""
+    return httpx2.Client(
+        follow_redirects=True,
+        timeout=HTTP_TIMEOUT,
+        # the local API is on the loopback interface, never behind a proxy
+        trust_env=not local,
+        transport=_MsgspecTransport(
+            retries=HTTP_RETRIES,
+            trust_env=not local,
+            limits=httpx2.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE)
+        )
+    )
+
+def _connect(local: bool) -> zotero.Zotero:
+    return zotero.Zotero(
         os.environ['ZOTERO_USER_ID'],
         "user",
         os.environ['ZOTERO_API_KEY'],
-        local=True
+        local=local,
+        client=_http_client(local)
     )
-    # Test local connection
-    zot_local.items(limit=1)
-    logger.info("Local Zotero API connected successfully")
+
+# Initialize the read and write Zotero connections
+try:
+    # Local API for fast reads (or the web API with ZOTERO_LOCAL=0)
+    zot = _connect(local=USE_LOCAL_API)
+    # Test read connection
+    zot.items(limit=1)
+    logger.info(f"{'Local' if USE_LOCAL_API else 'Remote'} Zotero API connected successfully for reads")
     
     # Remote API for writes
-    zot_remote = zotero.Zotero(
-        os.environ['ZOTERO_USER_ID'],
-        "user",
-        os.environ['ZOTERO_API_KEY'],
-        local=False
-    )
+    zot_remote = _connect(local=False)
     # Test remote connection
     zot_remote.item_types()
     logger.info("Remote Zotero API connected successfully")
@@ -63,119 +198,292 @@ except Exception as e:
         logger.error(f"Error connecting to Zotero APIs: {e}")
         exit(1)
 
-anthropic = Anthropic(api_key=os.environ.get('ANTHROPIC_API_KEY', '')) # Remove proxies parameter
+# pyzotero keeps per-request state (URL params, the last response) on the
+# client object, so each worker thread gets its own pair of clients
+_thread_clients = threading.local()
+
+def _thread_zotero(remote: bool) -> zotero.Zotero:
+    name = 'remote' if remote else 'local'
+    zot = getattr(_thread_clients, name, None)
+    if zot is None:
+        zot = _connect(local=USE_LOCAL_API and not remote)
+        setattr(_thread_clients, name, zot)
+    return zot
+
+async def _zotero_call(method: str, *args, remote: bool = False, **kwargs) -> Any:
+    """Run a blocking pyzotero call in a worker thread so it doesn't stall the event loop.
+    
+    Reads go to the read API (see USE_LOCAL_API), writes (remote=True) to the web API.
+    """
+    def call():
+        return getattr(_thread_zotero(remote), method)(*args, **kwargs)
+    return await asyncio.to_thread(call)
+
+def _make_view(item: Dict[str, Any], include_raw: bool = False) -> Dict[str, Any]:
+    """The curated fields of a Zotero item returned by search_papers and get_paper."""
+    data = item.get('data') or _EMPTY
+    date = data.get('date')
+    view = {
+        'key': item.get('key'),
+        'title': data.get('title', 'Unknown Title'),
+        'authors': data.get('creators', []),
+        'year': date.split('-')[0] if date else None,
+        # sorted so the same paper always serializes the same way, which keeps
+        # repeated results prompt-cacheable; authors keep their citation order
+        'tags': sorted(t['tag'] for t in data.get('tags') or ()),
+        'abstract': data.get('abstractNote'),
+        'url': data.get('url'),
+        'item_type': data.get('itemType')
+    }
+    if include_raw:
+        view['raw_data'] = item  # the full Zotero item, only when asked for
+    return view
+
+def _encode(result: Any) -> str:
+    return orjson.dumps(result, default=str).decode()
+
+def _tool(fn):
+    """Register fn as an MCP tool whose result is JSON-encoded with orjson.
+    
+    FastMCP would otherwise encode results with the stdlib json module. The
+    module-level function is returned unchanged, so direct callers still get dicts.
+    """
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def encoded(*args, **kwargs):
+            return _encode(await fn(*args, **kwargs))
+    else:
+        @functools.wraps(fn)
+        def encoded(*args, **kwargs):
+            return _encode(fn(*args, **kwargs))
+    mcp.add_tool(encoded)
+    return fn
+
+def _note_view(note: Dict[str, Any]) -> Dict[str, Any]:
+    data = note["data"]
+    return {
+        "key": note["key"],
+        "text": data.get("note", ""),
+        "tags": sorted(tag["tag"] for tag in data.get("tags") or ())
+    }
+
+def _read_client() -> httpx.AsyncClient:
+    """Async client for the read API, for fetching many things concurrently.
+    
+    pyzotero's client is synchronous and keeps per-request state, so it can't be
+    shared between concurrent requests.
+    """
+    return httpx.AsyncClient(
+        base_url=f"{zot.endpoint}/{zot.library_type}/{zot.library_id}",
+        headers=zot.default_headers(),
+        limits=httpx.Limits(max_connections=BATCH_CONCURRENCY),
+        timeout=HTTP_TIMEOUT
+    )
+
+def _storage_client() -> httpx.AsyncClient:
+    """Client for the file storage the web API redirects downloads to.
+    
+    It sends none of the API's headers: the API key must not reach the storage
+    host, whose presigned URLs also reject requests with an Authorization header.
+    """
+    return httpx.AsyncClient(follow_redirects=True, timeout=HTTP_TIMEOUT)
 
-@mcp.tool()
-def search_papers(tags: List[str] = None, query: str = None) -> dict:
+async def _fetch_json(client: httpx.AsyncClient, path: str, **params) -> Any:
+    response = await client.get(path, params={"format": "json", **params})
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+async def _fetch_item(client: httpx.AsyncClient, item_key: str) -> Dict[str, Any]:
+    """Async counterpart of _cached_item, sharing its cache."""
+    item = _ITEM_CACHE.get(item_key)
+    if item is None:
+        item = await _fetch_json(client, f"/items/{item_key}")
+        _ITEM_CACHE.set(item_key, item)
+    return item
+
+async def _download_file(client: httpx.AsyncClient, attachment_key: str) -> bytes:
+    """Get an attachment's file without blocking the event loop.
+    
+    The local API answers with a redirect to a file:// URL in Zotero's storage
+    directory, which is read directly in a worker thread; the web API redirects
+    to its file storage, which is fetched without the API's headers.
+    """
+    response = await client.get(f"/items/{attachment_key}/file")
+    if response.is_redirect:
+        location = response.headers['location']
+        if location.startswith('file:'):
+            path = Path(url2pathname(urlparse(location).path))
+            return await asyncio.to_thread(path.read_bytes)
+        async with _storage_client() as storage:
+            response = await storage.get(location)
+    response.raise_for_status()
+    return response.content
+
+def _extract_pdf_text(pdf_bytes: bytes) -> tuple:
+    """Text of every page of a PDF, and the page count."""
+    from pypdf import PdfReader  # only needed once a PDF is requested
+    
+    pdf_reader = PdfReader(BytesIO(pdf_bytes))
+    text_content = "".join(page.extract_text() + "\n" for page in pdf_reader.pages)
+    return text_content, len(pdf_reader.pages)
+
+async def _cached_item(item_key: str) -> Dict[str, Any]:
+    """The item from the read API, served from _ITEM_CACHE when it was fetched recently."""
+    item = _ITEM_CACHE.get(item_key)
+    if item is None:
+        item = await _zotero_call('item', item_key)
+        if item:
+            _ITEM_CACHE.set(item_key, item)
+    return item
+
+def _paper_title(item: Any) -> str:
+    """Title of a fetched item, tolerating a failed fetch."""
+    if not isinstance(item, dict):
+        return "Unknown Paper"
+    return (item.get('data') or _EMPTY).get('title', 'Unknown Title')
+
+@_tool
+async def search_papers(tags: List[str] = None, query: str = None, include_raw: bool = False,
+                  limit: int = 100, start: int = 0) -> dict:
     """Search through Zotero papers based on tags and/or text.
     
     Args:
         tags: List of tags to filter by
         query: Search query to filter by title and creator fields
+        include_raw: Also return each item's full Zotero data under raw_data
+        limit: Number of library entries to look at, at least 1 (attachments and notes among them are skipped)
+        start: Offset to start from; pass the previous response's next_start to get the next page
     """
+    if limit < 1:
+        # an empty page would hand back next_start == start, and a client
+        # following it would never get anywhere
+        return {"status": "error", "message": "limit must be at least 1", **_NO_CACHE}
+    
+    # repeated tags don't narrow the search, so drop them from the request and the cache key
+    tags = sorted(set(tags or ()))
+    cache_key = (tuple(tags), query, include_raw, limit, start)
+    cached = _SEARCH_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        if tags and query:
-            # If both tags and query are provided, first search by query then filter by tags
-            items = zot_local.items(q=query)
-            # Filter for tags client-side
-            items = [item for item in items 
-                    if all(tag in [t['tag'] for t in item['data'].get('tags', [])] 
-                    for tag in tags)]
-        elif tags:
-            # use a single tag for now since the API handles multiple tags differently
-            items = zot_local.items(tag=tags[0]) if len(tags) == 1 else zot_local.items()
-            # filter for multiple tags client-side if needed
-            if len(tags) > 1:
-                items = [item for item in items 
-                        if all(tag in [t['tag'] for t in item['data'].get('tags', [])] 
-                        for tag in tags)]
-        elif query:
-            # Search by query only
-            items = zot_local.items(q=query)
-        else:
-            items = zot_local.items()
-
-        # enhanced response with more useful information
+        # filter on the Zotero side: repeated tag= parameters must all match,
+        # and combine with the quick search in the same request
+        params = {}
+        if query:
+            params['q'] = query
+        if tags:
+            params['tag'] = tags
+        # enhanced response with more useful information, built a page at a
+        # time as the pages come in
         processed_items = []
-        for item in items:
+        next_start = None
+        offset, end = start, start + limit
+        while offset < end:
+            page_size = min(API_PAGE_SIZE, end - offset)
+            page = await _zotero_call('items', **params, start=offset, limit=page_size)
+            offset += len(page)
             # skip attachments and notes
-            if item.get('data', {}).get('itemType') in ['attachment', 'note']:
-                continue
-                
-            item_data = item.get('data', {})
-            processed_item = {
-                'key': item.get('key'),
-                'title': item_data.get('title', 'Unknown Title'),
-                'authors': item_data.get('creators', []),
-                'year': item_data.get('date', '').split('-')[0] if item_data.get('date') else None,
-                'tags': [t.get('tag') for t in item_data.get('tags', [])],
-                'abstract': item_data.get('abstractNote'),
-                'url': item_data.get('url'),
-                'item_type': item_data.get('itemType'),
-                'raw_data': item  # Include raw data for complete access 
-            }
-            processed_items.append(processed_item)
+            processed_items += [_make_view(item, include_raw) for item in page
+                                if (item.get('data') or _EMPTY).get('itemType') not in ('attachment', 'note')]
+            if len(page) < page_size:
+                break
+        else:
+            # stopped at the limit rather than the end of the results
+            next_start = offset
 
-        return {
+        result = {
             "status": "success", 
             "total_results": len(processed_items),
-            "items": processed_items
+            "items": processed_items,
+            "next_start": next_start
         }
+        _SEARCH_CACHE.set(cache_key, result)
+        return result
     except Exception as e:
         logger.error(f"Error searching papers: {str(e)}")
-        return {"status": "error", "message": str(e)}
+        return {"status": "error", "message": str(e), **_NO_CACHE}
 
-@mcp.tool()
-def get_paper_notes(item_key: str) -> Dict[str, Any]:
+@_tool
+async def get_paper_notes(item_key: str) -> Dict[str, Any]:
     """Get all notes attached to a specific paper."""
     try:
-        notes = zot_local.children(item_key)
+        notes = await _zotero_call('children', item_key)
         return {
-            "notes": [{
-                "key": note["key"],
-                "text": note["data"].get("note", ""),
-                "tags": [tag["tag"] for tag in note["data"].get("tags", [])]
-            } for note in notes if note["data"].get("itemType") == "note"]
+            "notes": [_note_view(note) for note in notes if note["data"].get("itemType") == "note"]
         }
     except Exception as e:
         logger.error(f"Error getting notes: {e}")
         raise ValueError(str(e))
 
-@mcp.tool()
-def get_paper(item_key: str) -> Dict[str, Any]:
-    """Get details for a specific paper."""
+@_tool
+async def get_paper(item_key: str, include_raw: bool = False) -> Dict[str, Any]:
+    """Get details for a specific paper.
+    
+    Args:
+        item_key: The Zotero item key
+        include_raw: Also return the item's full Zotero data under raw_data
+    """
     try:
-        item = zot_local.item(item_key)
+        item = await _cached_item(item_key)
         if not item:
-            return {"status": "error", "message": "Paper not found"}
+            return {"status": "error", "message": "Paper not found", **_NO_CACHE}
             
-        item_data = item.get('data', {})
-        processed_item = {
-            'key': item.get('key'),
-            'title': item_data.get('title', 'Unknown Title'),
-            'authors': item_data.get('creators', []),
-            'year': item_data.get('date', '').split('-')[0] if item_data.get('date') else None,
-            'tags': [t.get('tag') for t in item_data.get('tags', [])],
-            'abstract': item_data.get('abstractNote'),
-            'url': item_data.get('url'),
-            'item_type': item_data.get('itemType'),
-            'raw_data': item
-        }
-        return {"status": "success", "item": processed_item}
+        return {"status": "success", "item": _make_view(item, include_raw)}
     except Exception as e:
         logger.error(f"Error getting paper: {str(e)}")
-        return {"status": "error", "message": str(e)}
+        return {"status": "error", "message": str(e), **_NO_CACHE}
 
-@mcp.tool()
-def add_note(item_key: str, note_text: str, tags: List[str] = None) -> dict:
+@_tool
+async def get_papers_batch(item_keys: List[str], include_raw: bool = False) -> Dict[str, Any]:
+    """Get details for several papers at once; the papers are fetched concurrently.
+    
+    Args:
+        item_keys: The Zotero item keys
+        include_raw: Also return each item's full Zotero data under raw_data
+    """
+    async with _read_client() as client:
+        results = await asyncio.gather(*(_fetch_item(client, key) for key in item_keys),
+                                       return_exceptions=True)
+    
+    items, errors = [], {}
+    for key, result in zip(item_keys, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error getting paper {key}: {result}")
+            errors[key] = str(result)
+        else:
+            items.append(_make_view(result, include_raw))
+    return {"status": "success", "items": items, "errors": errors}
+
+@_tool
+async def get_paper_notes_batch(item_keys: List[str]) -> Dict[str, Any]:
+    """Get the notes of several papers at once; the papers are fetched concurrently.
+    
+    Args:
+        item_keys: The Zotero item keys
+    """
+    async with _read_client() as client:
+        results = await asyncio.gather(
+            *(_fetch_json(client, f"/items/{key}/children", limit=API_PAGE_SIZE) for key in item_keys),
+            return_exceptions=True
+        )
+    
+    notes, errors = {}, {}
+    for key, result in zip(item_keys, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error getting notes for {key}: {result}")
+            errors[key] = str(result)
+        else:
+            notes[key] = [_note_view(child) for child in result if child["data"].get("itemType") == "note"]
+    return {"notes": notes, "errors": errors}
+
+@_tool
+async def add_note(item_key: str, note_text: str, tags: List[str] = None) -> dict:
     """Add a note to a specific paper using remote API."""
     try:
-        # verify the paper exists first using local API
-        paper = get_paper(item_key)
-        if paper.get("status") == "error":
-            return paper
-        
-        # create the note using remote API
+        # create the note using remote API; it rejects an unknown parentItem,
+        # so the paper isn't looked up first. Its title, for the response, is
+        # fetched from the read API at the same time.
         template = {
             'itemType': 'note',
             'parentItem': item_key,
@@ -183,7 +491,13 @@ def add_note(item_key: str, note_text: str, tags: List[str] = None) -> dict:
             'tags': [{'tag': tag} for tag in (tags or [])]
         }
         
-        result = zot_remote.create_items([template])
+        result, paper = await asyncio.gather(
+            _zotero_call('create_items', [template], remote=True),
+            _cached_item(item_key),
+            return_exceptions=True
+        )
+        if isinstance(result, Exception):
+            raise result
         
         # Check if creation was successful
         if result.get("successful"):
@@ -191,86 +505,117 @@ def add_note(item_key: str, note_text: str, tags: List[str] = None) -> dict:
             return {
                 "status": "success",
                 "note_key": note_key,
-                "paper_title": paper["item"]["title"],
-                "method": "remote_api"
+                "paper_title": _paper_title(paper),
+                "method": "remote_api",
+                **_NO_CACHE  # a one-off confirmation, not worth caching
             }
         elif result.get("failed"):
             error_info = result.get("failed", {}).get("0", {})
             return {
                 "status": "error",
-                "message": f"Remote API error: {error_info}"
+                "message": f"Remote API error: {error_info}",
+                **_NO_CACHE
             }
         else:
             return {
                 "status": "error", 
-                "message": "Unknown response from remote API"
+                "message": "Unknown response from remote API",
+                **_NO_CACHE
             }
             
     except Exception as e:
         logger.error(f"Error adding note via remote API: {str(e)}")
-        return {"status": "error", "message": str(e)}
+        return {"status": "error", "message": str(e), **_NO_CACHE}
 
-@mcp.tool()
-def get_pdf_content(item_key: str) -> dict:
+async def _find_pdf_attachment(client: httpx.AsyncClient, item_key: str) -> Optional[str]:
+    """Key of the item's PDF attachment, or None if it has none."""
+    # First get the item to find its attachments
+    item = await _fetch_item(client, item_key)
+    
+    # Look for PDF attachment in the links
+    if 'attachment' in item['links'] and item['links']['attachment']['attachmentType'] == 'application/pdf':
+        return item['links']['attachment']['href'].split('/')[-1]
+    
+    # If not found in links, check children
+    children = await _fetch_json(client, f"/items/{item_key}/children", limit=API_PAGE_SIZE)
+    for child in children:
+        data = child['data']
+        if data.get('itemType') == 'attachment' and data.get('contentType') == 'application/pdf':
+            return child['key']
+    return None
+
+@_tool
+async def get_pdf_content(item_key: str) -> dict:
     """Get the PDF content for a given item.
     
     Args:
         item_key: The Zotero item key
     """
     try:
-        # First get the item to find its attachments
-        item = zot_local.item(item_key)
-        
-        pdf_bytes = None
-        attachment_key = None
-        
-        # Look for PDF attachment in the links
-        if 'attachment' in item['links'] and item['links']['attachment']['attachmentType'] == 'application/pdf':
-            attachment_key = item['links']['attachment']['href'].split('/')[-1]
-            # Get the PDF content
-            pdf_bytes = zot_local.file(attachment_key)
-        else:
-            # If not found in links, check children
-            children = zot_local.children(item_key)
-            for child in children:
-                if child['data'].get('itemType') == 'attachment' and child['data'].get('contentType') == 'application/pdf':
-                    attachment_key = child['key']
-                    pdf_bytes = zot_local.file(child['key'])
-                    break
-        
-        if pdf_bytes is None:
-            return {
-                'success': False,
-                'error': 'No PDF attachment found for this item'
-            }
+        async with _read_client() as client:
+            attachment_key = _PDF_ATTACHMENT_CACHE.get(item_key)
+            cached = attachment_key is not None
+            if not cached:
+                attachment_key = await _find_pdf_attachment(client, item_key)
+            
+            try:
+                if attachment_key is not None:
+                    pdf_bytes = await _download_file(client, attachment_key)
+            except (httpx.HTTPError, OSError):
+                _PDF_ATTACHMENT_CACHE.pop(item_key)
+                if not cached:
+                    raise
+                # the attachment may have been removed since it was cached;
+                # look it up again from a fresh copy of the item and retry once
+                _ITEM_CACHE.pop(item_key)
+                attachment_key = await _find_pdf_attachment(client, item_key)
+                if attachment_key is not None:
+                    pdf_bytes = await _download_file(client, attachment_key)
+            
+            if attachment_key is None:
+                return {
+                    'success': False,
+                    'error': 'No PDF attachment found for this item',
+                    **_NO_CACHE
+                }
+            _PDF_ATTACHMENT_CACHE.set(item_key, attachment_key)
         
-        # Extract text from PDF
+        # Extract text from PDF, off the event loop since it's CPU-bound
         try:
-            pdf_reader = PdfReader(BytesIO(pdf_bytes))
-            text_content = ""
-            for page in pdf_reader.pages:
-                text_content += page.extract_text() + "\n"
+            text_content, page_count = await asyncio.to_thread(_extract_pdf_text, pdf_bytes)
             
             return {
                 'success': True,
                 'text_content': text_content,
                 'attachment_key': attachment_key,
-                'page_count': len(pdf_reader.pages)
+                'page_count': page_count
             }
         except Exception as pdf_error:
             logger.error(f"Error extracting text from PDF: {pdf_error}")
             return {
                 'success': False,
-                'error': f'Failed to extract text from PDF: {str(pdf_error)}'
+                'error': f'Failed to extract text from PDF: {str(pdf_error)}',
+                **_NO_CACHE
             }
         
     except Exception as e:
         logger.error(f"Error getting PDF content: {e}")
         return {
             'success': False,
-            'error': str(e)
+            'error': str(e),
+            **_NO_CACHE
         }
 
+@_tool
+def get_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss counts and sizes of the server's response caches."""
+    return {
+        "item_cache": _ITEM_CACHE.stats(),
+        "search_cache": _SEARCH_CACHE.stats(),
+        "pdf_attachment_cache": _PDF_ATTACHMENT_CACHE.stats(),
+        **_NO_CACHE
+    }
+
 if __name__ == "__main__":
     # local testing
     load_dotenv()
@@ -1,7 +1,18 @@
+import os
 import sys
 from unittest.mock import MagicMock
 
+os.environ.setdefault('ZOTERO_USER_ID', '0')
+os.environ.setdefault('ZOTERO_API_KEY', 'test')
+
 mock_zotero = MagicMock()
 mock_zotero.zotero = MagicMock()
 
+# every Zotero(...) call returns this client
+mock_client = mock_zotero.zotero.Zotero.return_value
+mock_client.endpoint = "http://localhost:23119/api"
+mock_client.library_type = "users"
+mock_client.library_id = "0"
+mock_client.default_headers.return_value = {}
+
 sys.modules['pyzotero'] = mock_zotero
@@ -0,0 +1,203 @@
+import asyncio
+import importlib
+import sqlite3
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+SCHEMA = """
+CREATE TABLE itemTypes (itemTypeID INTEGER PRIMARY KEY, typeName TEXT);
+CREATE TABLE items (itemID INTEGER PRIMARY KEY, itemTypeID INT NOT NULL,
+    dateAdded TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    dateModified TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    libraryID INT NOT NULL, key TEXT NOT NULL, UNIQUE (libraryID, key));
+CREATE TABLE fields (fieldID INTEGER PRIMARY KEY, fieldName TEXT);
+CREATE TABLE itemDataValues (valueID INTEGER PRIMARY KEY, value UNIQUE);
+CREATE TABLE itemData (itemID INT, fieldID INT, valueID INT, PRIMARY KEY (itemID, fieldID));
+CREATE TABLE creators (creatorID INTEGER PRIMARY KEY, firstName TEXT, lastName TEXT);
+CREATE TABLE creatorTypes (creatorTypeID INTEGER PRIMARY KEY, creatorType TEXT);
+CREATE TABLE itemCreators (itemID INT NOT NULL, creatorID INT NOT NULL, creatorTypeID INT NOT NULL,
+    orderIndex INT NOT NULL, PRIMARY KEY (itemID, creatorID, creatorTypeID, orderIndex));
+CREATE TABLE tags (tagID INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE itemTags (itemID INT NOT NULL, tagID INT NOT NULL, type INT NOT NULL, PRIMARY KEY (itemID, tagID));
+CREATE TABLE itemNotes (itemID INTEGER PRIMARY KEY, parentItemID INT, note TEXT, title TEXT);
+CREATE TABLE itemAttachments (itemID INTEGER PRIMARY KEY, parentItemID INT, linkMode INT,
+    contentType TEXT, path TEXT);
+INSERT INTO itemTypes VALUES (1, 'note'), (2, 'journalArticle'), (3, 'attachment'), (4, 'book');
+INSERT INTO fields VALUES (1, 'title'), (2, 'abstractNote'), (3, 'url'), (4, 'date'), (5, 'publisher');
+INSERT INTO creatorTypes VALUES (1, 'author'), (2, 'editor');
+INSERT INTO creators VALUES (1, 'Ashish', 'Vaswani'), (2, 'Noam', 'Shazeer'), (3, 'Kaiming', 'He'),
+    (4, 'Jennifer', 'Widom');
+INSERT INTO tags VALUES (1, 'ml'), (2, 'nlp'), (3, 'vision'), (4, 'db');
+INSERT INTO itemDataValues VALUES (1, 'Attention Is All You Need'), (2, 'Transformers for translation'),
+    (3, '2017-06-12'), (4, 'Deep Residual Learning'), (5, '2015-12-10'), (6, 'Database Systems'),
+    (7, 'SQL and attention to detail'), (8, 'Pub');
+INSERT INTO items (itemID, itemTypeID, dateModified, libraryID, key) VALUES
+    (1, 2, '2024-02-01', 1, 'AAAA1111'), (2, 2, '2024-02-02', 1, 'BBBB2222'),
+    (3, 4, '2024-02-03', 1, 'CCCC3333'), (10, 1, '2024-03-01', 1, 'NOTE0001'),
+    (11, 3, '2024-03-01', 1, 'ATTACH01');
+INSERT INTO itemData VALUES (1, 1, 1), (1, 2, 2), (1, 4, 3), (1, 5, 8), (2, 1, 4), (2, 4, 5),
+    (3, 1, 6), (3, 2, 7);
+INSERT INTO itemCreators VALUES (1, 1, 1, 0), (1, 2, 1, 1), (2, 3, 1, 0), (3, 4, 2, 0);
+INSERT INTO itemTags VALUES (1, 1, 0), (1, 2, 0), (2, 1, 0), (2, 3, 0), (3, 4, 0), (10, 1, 0);
+INSERT INTO itemNotes VALUES (10, 1, '<p>first note</p>', 'first note');
+INSERT INTO itemAttachments VALUES (11, 1, 0, 'application/pdf', 'storage:paper.pdf');
+"""
+
+def make_zotero_db(path) -> str:
+    """A small library in Zotero's schema: three papers, a note and a PDF attachment."""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+    return str(path)
+
+def make_pdf(path, texts):
+    """Write a PDF with one line of text per page."""
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica")
+    })
+    writer = PdfWriter()
+    for text in texts:
+        page = writer.add_blank_page(width=200, height=200)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})
+        })
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 20 100 Td ({text}) Tj ET".encode())
+        page.replace_contents(content)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer.write(path)
+
+@pytest.fixture(scope="module")
+def db_server(tmp_path_factory):
+    # the module opens ZOTERO_DB_PATH when it's imported
+    tmp = tmp_path_factory.mktemp("zotero")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("ZOTERO_DB_PATH", make_zotero_db(tmp / "zotero.sqlite"))
+        mp.setenv("ZOTERO_MCP_CACHE_DIR", str(tmp / "cache"))
+        yield importlib.import_module("zotero_mcp.db_server")
+
+@pytest.fixture
+def zotero_db(db_server, tmp_path, monkeypatch):
+    """A fresh database behind the tools for each test."""
+    monkeypatch.setattr(db_server, "CACHE_DIR", tmp_path / "cache")
+    db = db_server.ZoteroDatabase(make_zotero_db(tmp_path / "zotero.sqlite"))
+    monkeypatch.setattr(db_server, "db", db)
+    return db
+
+def search_keys(db_server, **kwargs):
+    result = asyncio.run(db_server.search_papers(**kwargs))
+    assert result["status"] == "success"
+    return [item["key"] for item in result["items"]]
+
+def test_search_by_tags(db_server, zotero_db):
+    assert search_keys(db_server, tags=["ml"]) == ["BBBB2222", "AAAA1111"]
+    # every tag has to match, repeats don't change that
+    assert search_keys(db_server, tags=["ml", "nlp", "ml"]) == ["AAAA1111"]
+    assert search_keys(db_server, tags=["ml", "db"]) == []
+
+@pytest.mark.parametrize("fts", [True, False])
+def test_search_by_query(db_server, zotero_db, fts):
+    # the FTS index covers abstracts too, the LIKE fallback only titles
+    assert zotero_db.fts_enabled
+    zotero_db.fts_enabled = fts
+    assert search_keys(db_server, query="residual") == ["BBBB2222"]
+    expected = ["CCCC3333", "AAAA1111"] if zotero_db.fts_enabled else ["AAAA1111"]
+    assert search_keys(db_server, query="attention") == expected
+
+def test_search_by_tags_and_query(db_server, zotero_db):
+    assert search_keys(db_server, tags=["ml"], query="attention") == ["AAAA1111"]
+    assert search_keys(db_server, tags=["db"], query="residual") == []
+
+def test_search_skips_notes_and_attachments(db_server, zotero_db):
+    assert search_keys(db_server) == ["CCCC3333", "BBBB2222", "AAAA1111"]
+
+def test_get_paper(db_server, zotero_db):
+    result = asyncio.run(db_server.get_paper("AAAA1111"))
+    assert result["status"] == "success"
+    assert result["item"] == {
+        "key": "AAAA1111",
+        "title": "Attention Is All You Need",
+        "authors": [
+            {"firstName": "Ashish", "lastName": "Vaswani", "creatorType": "author"},
+            {"firstName": "Noam", "lastName": "Shazeer", "creatorType": "author"}
+        ],
+        "year": "2017",
+        "tags": ["ml", "nlp"],
+        "abstract": "Transformers for translation",
+        "url": None,
+        "item_type": "journalArticle"
+    }
+
+    result = asyncio.run(db_server.get_paper("ZZZZ9999"))
+    assert result["status"] == "error"
+
+def test_get_item_notes(db_server, zotero_db):
+    notes = zotero_db.get_item_notes("AAAA1111")
+    assert [(n["key"], n["note"], n["tags"]) for n in notes] == [("NOTE0001", "<p>first note</p>", ["ml"])]
+    assert zotero_db.get_item_notes("BBBB2222") == []
+
+def test_add_note_with_duplicate_tags(db_server, zotero_db):
+    result = asyncio.run(db_server.add_note("BBBB2222", "hello", tags=["new", "ml", "new"]))
+    assert result["status"] == "success"
+    assert result["paper_title"] == "Deep Residual Learning"
+
+    notes = asyncio.run(db_server.get_paper_notes("BBBB2222"))["notes"]
+    assert [(n["key"], n["text"], n["tags"]) for n in notes] == [(result["note_key"], "hello", ["ml", "new"])]
+    # the existing tag was reused, the new one created once
+    conn = zotero_db._connection()
+    assert conn.execute("SELECT COUNT(*) FROM tags WHERE name IN ('ml', 'new')").fetchone()[0] == 2
+    # notes aren't returned by searches, even when they carry the tag
+    assert search_keys(db_server, tags=["new"]) == []
+
+def test_add_note_to_missing_paper(db_server, zotero_db):
+    result = asyncio.run(db_server.add_note("ZZZZ9999", "hello"))
+    assert result["status"] == "error"
+
+def test_get_pdf_content_in_process_pool(db_server, zotero_db, monkeypatch):
+    texts = [f"Page {i}" for i in range(1, 13)]
+    assert len(texts) >= db_server.PARALLEL_PDF_MIN_PAGES
+    make_pdf(zotero_db.storage_path / "ATTACH01" / "paper.pdf", texts)
+    # a fresh pool of a few spawned workers, so pages are split over several
+    monkeypatch.setattr(db_server, "_pdf_pool", None)
+    monkeypatch.setattr(db_server.os, "cpu_count", lambda: 3)
+    try:
+        result = asyncio.run(db_server.get_pdf_content("AAAA1111"))
+        assert db_server._pdf_pool is not None
+    finally:
+        if db_server._pdf_pool is not None:
+            db_server._pdf_pool.shutdown()
+
+    assert result["success"] == True
+    assert result["page_count"] == 12
+    assert result["text_content"].split() == " ".join(texts).split()
+
+def test_get_pdf_content_resolves_storage_path(db_server, zotero_db):
+    attachment_dir = zotero_db.storage_path / "ATTACH01"
+    make_pdf(attachment_dir / "paper.pdf", ["Attention"])
+    # another PDF in the directory; the attachment's storage: path picks the right one
+    make_pdf(attachment_dir / "a-supplement.pdf", ["Supplement", "More"])
+
+    result = asyncio.run(db_server.get_pdf_content("AAAA1111"))
+    assert result["success"] == True
+    assert result["attachment_key"] == "ATTACH01"
+    assert result["page_count"] == 1
+    assert result["text_content"].strip() == "Attention"
+    assert zotero_db._pdf_path_cache["ATTACH01"] == attachment_dir / "paper.pdf"
+
+    # a cached path that went away is resolved again, here by listing the directory
+    (attachment_dir / "paper.pdf").unlink()
+    result = asyncio.run(db_server.get_pdf_content("AAAA1111"))
+    assert result["page_count"] == 2
+    assert zotero_db._pdf_path_cache["ATTACH01"] == attachment_dir / "a-supplement.pdf"
+
+def test_get_pdf_content_missing_file(db_server, zotero_db):
+    (zotero_db.storage_path / "ATTACH01").mkdir(parents=True)
+    result = asyncio.run(db_server.get_pdf_content("AAAA1111"))
+    assert result["success"] == False
+    assert "ATTACH01" not in zotero_db._pdf_path_cache
+
+    # papers without a PDF attachment
+    assert asyncio.run(db_server.get_pdf_content("BBBB2222"))["success"] == False
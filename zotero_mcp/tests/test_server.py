@@ -1,6 +1,10 @@
+import asyncio
+import httpx
 import pytest
-from unittest.mock import Mock, patch
-from zotero_mcp.server import search_papers, get_paper_notes, add_note, request_summary, get_paper, get_pdf_content
+from io import BytesIO
+from pypdf import PdfWriter
+from zotero_mcp import server
+from zotero_mcp.server import search_papers, get_paper_notes, add_note, get_paper, get_pdf_content
 
 # Mock data
 MOCK_ITEMS = [
@@ -45,80 +49,243 @@ MOCK_CHILDREN = [
     }
 ]
 
+def make_pdf() -> bytes:
+    writer = PdfWriter()
+    writer.add_blank_page(width=100, height=100)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+PDF_BYTES = make_pdf()
+
 @pytest.fixture
 def mock_zotero():
-    with patch('zotero_mcp.server.zot') as mock_zot:
-        mock_zot.items.return_value = MOCK_ITEMS
-        mock_zot.children.return_value = MOCK_NOTES
-        mock_zot.item_template.return_value = {"note": "", "tags": []}
-        mock_zot.create_items.return_value = {"successful": {"0": {"key": "NEW123"}}}
-        mock_zot.item.return_value = MOCK_ITEMS[0]
-        mock_zot.update_item.return_value = None
-        mock_zot.file.return_value = b"PDF content"
-        yield mock_zot
+    # every pyzotero client the server creates is the same mock (see conftest)
+    mock_zot = server.zotero.Zotero.return_value
+    mock_zot.reset_mock(return_value=False, side_effect=True)
+    mock_zot.items.return_value = MOCK_ITEMS
+    mock_zot.children.return_value = MOCK_NOTES
+    mock_zot.create_items.return_value = {"successful": {"0": {"key": "NEW123"}}}
+    mock_zot.item.return_value = MOCK_ITEMS[0]
+    server._ITEM_CACHE.clear()
+    server._SEARCH_CACHE.clear()
+    server._PDF_ATTACHMENT_CACHE.clear()
+    yield mock_zot
+
+@pytest.fixture
+def stored_pdf(tmp_path):
+    """The PDF123 attachment's file in Zotero's storage directory."""
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(PDF_BYTES)
+    return path
+
+@pytest.fixture
+def mock_api(monkeypatch, stored_pdf):
+    """Serve the async tools' HTTP requests from the mock data."""
+    children = {"ABC123": []}
+    
+    def handler(request):
+        path = request.url.path
+        if request.url.host == "files.example.org":
+            # the API key must never reach the storage host
+            assert "authorization" not in request.headers
+            return httpx.Response(200, content=PDF_BYTES)
+        if path.endswith("/GONE/file"):
+            return httpx.Response(404, text="Not found")
+        if path.endswith("/PDF123/file"):
+            # the local API points at the file in Zotero's storage directory
+            return httpx.Response(302, headers={"Location": stored_pdf.as_uri()})
+        if path.endswith("/file"):
+            # the web API redirects to its file storage
+            return httpx.Response(302, headers={"Location": "https://files.example.org/paper.pdf"})
+        if path.endswith("/children"):
+            return httpx.Response(200, json=children["ABC123"])
+        if path.endswith("/MISSING"):
+            return httpx.Response(404, text="Not found")
+        return httpx.Response(200, json=MOCK_ITEMS[0])
+    
+    def client():
+        return httpx.AsyncClient(base_url="http://localhost:23119/api/users/0",
+                                 headers={"Authorization": "Bearer test"},
+                                 transport=httpx.MockTransport(handler))
+    
+    def storage_client():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(server, "_read_client", client)
+    monkeypatch.setattr(server, "_storage_client", storage_client)
+    return children
 
 def test_search_papers(mock_zotero):
     """Test the search_papers function."""
     # Test searching by tags only
-    result = search_papers(tags=['tag1'])
+    result = asyncio.run(search_papers(tags=['tag1']))
     assert result['status'] == "success"
     assert len(result['items']) == 1
     assert result['items'][0]['title'] == 'Test Paper'
 
     # Test searching by query only
-    result = search_papers(query='Test Paper')
+    result = asyncio.run(search_papers(query='Test Paper'))
     assert result['status'] == "success"
     assert len(result['items']) == 1
     assert result['items'][0]['title'] == 'Test Paper'
 
     # Test searching by both tags and query
-    result = search_papers(tags=['tag1'], query='Test Paper')
+    result = asyncio.run(search_papers(tags=['tag1'], query='Test Paper'))
     assert result['status'] == "success"
     assert len(result['items']) == 1
     assert result['items'][0]['title'] == 'Test Paper'
 
     # Test searching with no parameters
-    result = search_papers()
+    result = asyncio.run(search_papers())
     assert result['status'] == "success"
     assert len(result['items']) == 1
+    assert result['next_start'] is None
+
+def test_search_papers_filters_tags_server_side(mock_zotero):
+    asyncio.run(search_papers(tags=['b', 'a', 'b'], query='Test'))
+    mock_zotero.items.assert_called_once_with(q='Test', tag=['a', 'b'], start=0, limit=100)
 
 def test_get_paper(mock_zotero):
-    result = get_paper("ABC123")
+    result = asyncio.run(get_paper("ABC123"))
     assert result["status"] == "success"
     assert result["item"]["title"] == "Test Paper"
     assert result["item"]["key"] == "ABC123"
+    assert "raw_data" not in result["item"]
+
+def library_pages(count):
+    """items() side effect serving a library of count papers page by page."""
+    library = [{"key": f"K{i:03}", "data": {"title": f"Paper {i}", "itemType": "journalArticle"}}
+               for i in range(count)]
+    return lambda start, limit, **params: library[start:start + limit]
+
+def test_search_papers_pages_through_results(mock_zotero):
+    mock_zotero.items.side_effect = library_pages(250)
+    
+    result = asyncio.run(search_papers(limit=150))
+    assert [c.kwargs["limit"] for c in mock_zotero.items.call_args_list] == [100, 50]
+    assert len(result["items"]) == 150
+    # stopped at the limit, so there may be more
+    assert result["next_start"] == 150
+    
+    result = asyncio.run(search_papers(limit=150, start=result["next_start"]))
+    assert [i["key"] for i in result["items"]] == [f"K{i:03}" for i in range(150, 250)]
+    # ran out of results before the limit
+    assert result["next_start"] is None
+
+def test_search_papers_rejects_empty_limit(mock_zotero):
+    result = asyncio.run(search_papers(limit=0))
+    assert result["status"] == "error"
+    mock_zotero.items.assert_not_called()
+
+def test_search_papers_tolerates_null_fields(mock_zotero):
+    item = {"key": "NUL123", "data": {"title": None, "date": None, "itemType": "book"}}
+    mock_zotero.items.return_value = [item, MOCK_ITEMS[0]]
+    result = asyncio.run(search_papers())
+    assert result["status"] == "success"
+    assert [i["key"] for i in result["items"]] == ["NUL123", "ABC123"]
+    assert result["items"][0]["title"] is None
+    assert result["items"][0]["year"] is None
 
 def test_get_paper_notes(mock_zotero):
-    result = get_paper_notes("ABC123")
+    result = asyncio.run(get_paper_notes("ABC123"))
     assert len(result["notes"]) == 1
     assert result["notes"][0]["key"] == "NOTE123"
     assert result["notes"][0]["text"] == "Test note content"
 
 def test_add_note(mock_zotero):
-    result = add_note("ABC123", "New note", tags=["test"])
+    result = asyncio.run(add_note("ABC123", "New note", tags=["test"]))
     assert result["status"] == "success"
     assert result["note_key"] == "NEW123"
+    assert result["paper_title"] == "Test Paper"
 
-def test_get_pdf_content_from_links(mock_zotero):
-    result = get_pdf_content("ABC123")
+def test_get_pdf_content_from_links(mock_zotero, mock_api):
+    result = asyncio.run(get_pdf_content("ABC123"))
     assert result["success"] == True
-    assert result["content"] == b"PDF content"
+    assert result["page_count"] == 1
     assert result["attachment_key"] == "PDF123"
 
-def test_get_pdf_content_from_children(mock_zotero):
+def test_get_pdf_content_from_children(mock_zotero, mock_api):
     # Remove attachment from links and set up children with PDF
     mock_item = MOCK_ITEMS[0].copy()
     mock_item["links"] = {}
-    mock_zotero.item.return_value = mock_item
-    mock_zotero.children.return_value = MOCK_CHILDREN
+    server._ITEM_CACHE.set("ABC123", mock_item)
+    mock_api["ABC123"] = MOCK_CHILDREN
     
-    result = get_pdf_content("ABC123")
+    result = asyncio.run(get_pdf_content("ABC123"))
     assert result["success"] == True
-    assert result["content"] == b"PDF content"
+    assert result["page_count"] == 1
     assert result["attachment_key"] == "PDF456"
 
-def test_request_summary(mock_zotero):
-    result = request_summary("ABC123")
+def test_get_pdf_content_forgets_attachment_after_failed_download(mock_zotero, mock_api, stored_pdf):
+    assert asyncio.run(get_pdf_content("ABC123"))["success"] == True
+    assert server._PDF_ATTACHMENT_CACHE.get("ABC123") == "PDF123"
+    
+    # the attachment's file went away, and looking it up again doesn't help
+    stored_pdf.unlink()
+    result = asyncio.run(get_pdf_content("ABC123"))
+    assert result["success"] == False
+    assert server._PDF_ATTACHMENT_CACHE.get("ABC123") is None
+
+def test_get_pdf_content_resolves_stale_attachment_again(mock_zotero, mock_api):
+    # the cached attachment was replaced since it was looked up
+    server._PDF_ATTACHMENT_CACHE.set("ABC123", "GONE")
+    result = asyncio.run(get_pdf_content("ABC123"))
+    assert result["success"] == True
+    assert result["attachment_key"] == "PDF123"
+    assert server._PDF_ATTACHMENT_CACHE.get("ABC123") == "PDF123"
+
+def test_get_papers_batch_reports_errors_per_key(mock_zotero, mock_api):
+    result = asyncio.run(server.get_papers_batch(["ABC123", "MISSING"]))
     assert result["status"] == "success"
-    assert result["message"] == "Summary requested"
-    mock_zotero.update_item.assert_called_once()
\ No newline at end of file
+    assert [item["key"] for item in result["items"]] == ["ABC123"]
+    assert list(result["errors"]) == ["MISSING"]
+
+def test_search_papers_cache_key(mock_zotero):
+    asyncio.run(search_papers(tags=["b", "a"], query="Test"))
+    # same tags in another order, or repeated, is the same search
+    asyncio.run(search_papers(tags=["a", "b", "a"], query="Test"))
+    assert mock_zotero.items.call_count == 1
+    
+    asyncio.run(search_papers(tags=["a", "b"], query="Other"))
+    asyncio.run(search_papers(tags=["a", "b"], query="Test", include_raw=True))
+    asyncio.run(search_papers(tags=["a", "b"], query="Test", start=100))
+    assert mock_zotero.items.call_count == 4
+
+def test_ttl_cache_expiry():
+    cache = server._TTLCache(maxsize=4, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+    
+    cache = server._TTLCache(maxsize=4, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = server._TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # now b is the oldest
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_get_pdf_content_storage_rejects_authorization(mock_zotero, mock_api, monkeypatch):
+    # like S3's presigned URLs, refuse any request carrying an Authorization header
+    def storage(request):
+        if "authorization" in request.headers:
+            return httpx.Response(403, text="Only one auth mechanism allowed")
+        return httpx.Response(200, content=PDF_BYTES)
+    
+    monkeypatch.setattr(server, "_storage_client",
+                        lambda: httpx.AsyncClient(transport=httpx.MockTransport(storage)))
+    mock_item = MOCK_ITEMS[0].copy()
+    mock_item["links"] = {}
+    server._ITEM_CACHE.set("ABC123", mock_item)
+    mock_api["ABC123"] = MOCK_CHILDREN
+    
+    result = asyncio.run(get_pdf_content("ABC123"))
+    assert result["success"] == True
+    assert result["attachment_key"] == "PDF456"